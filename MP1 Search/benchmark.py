@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+# benchmark.py
+# ---------------
+# Licensing Information:  You are free to use or extend this projects for
+# educational purposes provided that (1) you do not distribute or publish
+# solutions, (2) you retain this notice, and (3) you provide clear
+# attribution to the University of Illinois at Urbana-Champaign
+
+"""
+This file runs the search methods over a grid of generated mazes and writes one row per
+(maze, method) run with the wall time, states explored, path length, path validity and
+peak resident memory, as CSV or JSON, so scaling curves can be compared across changes.
+Every run happens in its own process (see `grade.run_cases`), so peak memory is per run
+(and empty where the `resource` module is unavailable).
+"""
+
+import argparse, csv, itertools, json, os, sys, tempfile
+
+import generate
+import grade
+import maze
+
+FIELDS = ('layout', 'size', 'density', 'waypoints', 'seed', 'method',
+    'elapsed', 'states_explored', 'path_length', 'valid', 'peak_memory', 'finished')
+
+def benchmark(directory, sizes, densities, layouts, waypoints, methods, seed = 0, jobs = 1, timeout = None):
+    """
+    Generates every combination of the maze parameters into `directory` and runs every method on each.
+
+    @return rows: a list of dicts with the keys in FIELDS
+    """
+    cases = {}
+    for layout, size, density, count in itertools.product(layouts, sizes, densities, waypoints):
+        path = os.path.join(directory, '{0}-{1}-{2}-{3}-{4}'.format(layout, size, density, count, seed))
+        generate.write(path, generate.generate(size, size, density, layout, count, seed))
+        cases[path] = {'layout': layout, 'size': size, 'density': density, 'waypoints': count, 'seed': seed}
+
+    runs = grade.run_cases(tuple({path: path for path in cases} for _ in methods), methods, jobs, timeout)
+    rows = []
+    for method, part in zip(methods, runs):
+        for path, run in part.items():
+            row = dict(cases[path], method = method, finished = run is not None)
+            if run is not None:
+                row.update(
+                    elapsed         = run['elapsed'],
+                    states_explored = run['states_explored'],
+                    path_length     = len(run['path']),
+                    valid           = maze.Maze(path).validate_path(run['path']) is None,
+                    peak_memory     = run['peak_memory'])
+            rows.append(row)
+    return rows
+
+def parse_list(kind):
+    return lambda text: [kind(x) for x in text.split(',')]
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description     = 'CS440 MP1 search benchmark',
+        formatter_class = argparse.ArgumentDefaultsHelpFormatter)
+
+    parser.add_argument('--sizes', dest = 'sizes', type = parse_list(int), default = [51, 101, 201],
+                        help = 'comma separated maze side lengths')
+    parser.add_argument('--densities', dest = 'densities', type = parse_list(float), default = [0.1, 0.3],
+                        help = 'comma separated wall densities')
+    parser.add_argument('--layouts', dest = 'layouts', type = parse_list(str), default = ['open', 'maze'],
+                        help = 'comma separated maze layouts (open, maze)')
+    parser.add_argument('--waypoints', dest = 'waypoints', type = parse_list(int), default = [1, 4],
+                        help = 'comma separated waypoint counts')
+    parser.add_argument('--methods', dest = 'methods', type = parse_list(str),
+                        default = ['bfs', 'astar_single', 'astar_multiple', 'fast'],
+                        help = 'comma separated search methods')
+    parser.add_argument('--seed', dest = 'seed', type = int, default = 0,
+                        help = 'random seed of the generated mazes')
+    parser.add_argument('--jobs', dest = 'jobs', type = int, default = 1,
+                        help = 'runs in flight at a time')
+    parser.add_argument('--timeout', dest = 'timeout', type = float, default = None,
+                        help = 'wall-clock seconds allowed per run')
+    parser.add_argument('--format', dest = 'format', type = str, default = 'csv', choices = ('csv', 'json'),
+                        help = 'output format')
+    parser.add_argument('--output', dest = 'output', type = str, default = None,
+                        help = 'output file (default stdout)')
+    parser.add_argument('--directory', dest = 'directory', type = str, default = None,
+                        help = 'keep the generated mazes in this directory')
+
+    arguments = parser.parse_args()
+    with tempfile.TemporaryDirectory() as scratch:
+        directory = arguments.directory or scratch
+        os.makedirs(directory, exist_ok = True)
+        rows = benchmark(directory, arguments.sizes, arguments.densities, arguments.layouts,
+            arguments.waypoints, arguments.methods, arguments.seed, arguments.jobs, arguments.timeout)
+
+    file = open(arguments.output, 'w', newline = '') if arguments.output else sys.stdout
+    if arguments.format == 'csv':
+        writer = csv.DictWriter(file, FIELDS)
+        writer.writeheader()
+        writer.writerows(rows)
+    else:
+        json.dump(rows, file, indent = 1)
+    if file is not sys.stdout:
+        file.close()
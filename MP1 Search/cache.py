@@ -0,0 +1,119 @@
+# cache.py
+# ---------------
+# Licensing Information:  You are free to use or extend this projects for
+# educational purposes provided that (1) you do not distribute or publish
+# solutions, (2) you retain this notice, and (3) you provide clear
+# attribution to the University of Illinois at Urbana-Champaign
+
+"""
+This file contains an opt-in on-disk cache of search results. An entry holds the path and
+`states_explored` of one `search.<method>(maze, **arguments)` run and is keyed by the maze
+contents (`Maze.digest`), the method name, its arguments and the source of `search.py`,
+`maze.py` and every module of this directory they import, so editing the maze or the
+searches never returns a stale result. Entries are files in one
+directory; the least recently used ones are deleted once the directory exceeds `max_bytes`.
+"""
+
+import hashlib
+import os
+import pickle
+import sys
+import types
+
+import maze
+import search
+
+def local_modules(roots):
+    """
+    Returns `roots` and every module in the directory of `search.py` that they import, directly
+    or through other such modules, sorted by name. Names imported with `from x import y` count
+    as imports of `x`.
+    """
+    directory   = os.path.dirname(os.path.abspath(search.__file__))
+    found       = {}
+    stack       = list(roots)
+    while stack:
+        module = stack.pop()
+        if module.__name__ in found:
+            continue
+        found[module.__name__] = module
+        for value in vars(module).values():
+            name = value.__name__ if isinstance(value, types.ModuleType) else getattr(value, '__module__', None)
+            other = sys.modules.get(name) if isinstance(name, str) else None
+            path = getattr(other, '__file__', None)
+            if path and os.path.dirname(os.path.abspath(path)) == directory:
+                stack.append(other)
+    return [found[name] for name in sorted(found)]
+
+class SolutionCache:
+    """
+    Search results stored as one pickle file per key in `directory`, at most `max_bytes` in total.
+    """
+    def __init__(self, directory, max_bytes = 64 << 20):
+        self.directory  = directory
+        self.max_bytes  = max_bytes
+        version = hashlib.sha1()
+        for module in local_modules((maze, search)):
+            with open(module.__file__, 'rb') as file:
+                version.update(module.__name__.encode() + b'\0' + file.read())
+        self._version = version.hexdigest()
+        os.makedirs(directory, exist_ok = True)
+
+    def key(self, maze, method, arguments = {}):
+        text = repr((self._version, maze.digest(), method, sorted(arguments.items())))
+        return hashlib.sha1(text.encode()).hexdigest()
+
+    def get(self, maze, method, arguments = {}):
+        """Returns the stored (path, states_explored) for the run, or None"""
+        path = os.path.join(self.directory, self.key(maze, method, arguments))
+        try:
+            with open(path, 'rb') as file:
+                result = pickle.load(file)
+            # the modification time orders entries for eviction
+            os.utime(path)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return None
+        return result
+
+    def put(self, maze, method, arguments, path, states_explored):
+        name = os.path.join(self.directory, self.key(maze, method, arguments))
+        try:
+            with open(name + '.tmp', 'wb') as file:
+                pickle.dump((path, states_explored), file)
+            os.replace(name + '.tmp', name)
+        except OSError:
+            return
+        self.evict()
+
+    def evict(self):
+        """Deletes the least recently used entries until the directory fits in `max_bytes`"""
+        entries = []
+        for entry in os.scandir(self.directory):
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime_ns, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            total -= size
+
+    def solve(self, maze, method, ** arguments ):
+        """
+        Returns `search.<method>(maze, **arguments)`, from the cache when possible. On a hit no
+        search runs and the stored number of explored states is added to `maze.states_explored`.
+        """
+        result = self.get(maze, method, arguments)
+        if result is not None:
+            maze.states_explored += result[1]
+            return result[0]
+        explored = maze.states_explored
+        path = getattr(search, method)(maze, ** arguments )
+        self.put(maze, method, arguments, path, maze.states_explored - explored)
+        return path
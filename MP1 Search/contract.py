@@ -0,0 +1,103 @@
+# contract.py
+# ---------------
+# Licensing Information:  You are free to use or extend this projects for
+# educational purposes provided that (1) you do not distribute or publish
+# solutions, (2) you retain this notice, and (3) you provide clear
+# attribution to the University of Illinois at Urbana-Champaign
+
+"""
+This file contains a reduced graph of a maze. Dead ends that hold no waypoint are pruned
+away, and every chain of corridor cells (exactly two open neighbors) is collapsed into a
+single weighted edge between junctions. The start and the waypoints are always junctions,
+so shortest paths on the reduced graph expand back into shortest paths on the maze.
+"""
+
+from array import array
+
+from pqueue import IndexedHeap
+
+class JunctionGraph:
+    """
+    Weighted graph over the junction cell ids of `maze`, with the corridor cells of each edge.
+    """
+    def __init__(self, maze):
+        self.maze       = maze
+        self.edges      = {}    # junction -> {junction: cost}
+        self.corridors  = {}    # (junction, junction) -> cell ids strictly between them
+
+        adjacent    = maze.adjacent_ids
+        keep        = {maze.index( * maze.start )} | {maze.index( * x ) for x in maze.waypoints}
+        self.alive  = alive = maze.free_mask()
+        degree      = array('i', (len(adjacent(k)) if alive[k] else 0 for k in range(len(alive))))
+
+        # peels dead ends one cell at a time until every remaining end is the start or a waypoint
+        stack = [k for k in range(len(alive)) if alive[k] and degree[k] <= 1 and k not in keep]
+        while stack:
+            k = stack.pop()
+            if not alive[k]:
+                continue
+            alive[k] = 0
+            for x in adjacent(k):
+                if alive[x]:
+                    degree[x] -= 1
+                    if degree[x] <= 1 and x not in keep:
+                        stack.append(x)
+
+        self.junctions = {k for k in range(len(alive)) if alive[k] and (degree[k] != 2 or k in keep)}
+        for u in self.junctions:
+            self.edges.setdefault(u, {})
+            for x in adjacent(u):
+                if not alive[x]:
+                    continue
+                previous, k, cells = u, x, []
+                while k not in self.junctions:
+                    cells.append(k)
+                    previous, k = k, next(y for y in adjacent(k) if alive[y] and y != previous)
+                if k != u and len(cells) + 1 < self.edges[u].get(k, len(cells) + 2):
+                    self.edges[u][k] = len(cells) + 1
+                    self.corridors[u, k] = cells
+
+    def expand(self, junctions):
+        """Expands a sequence of adjacent junctions into the cell ids along their corridors"""
+        result = list(junctions[:1])
+        for u, v in zip(junctions, junctions[1:]):
+            result.extend(self.corridors[u, v])
+            result.append(v)
+        return result
+
+    def path(self, source, targets):
+        """
+        Runs A* between junctions from `source` to the closest of `targets`.
+
+        @return path: a list of cell ids from `source` to the reached target, or [] if none is reachable
+        """
+        maze = self.maze
+        m = maze.size.x
+        targets = set(targets)
+        goals = [divmod(k, m) for k in targets]
+        heuristic = lambda k: min(abs(k // m - i) + abs(k % m - j) for i, j in goals)
+        queue = IndexedHeap()
+        queue.push(source, heuristic(source), 0)
+        g = {source: 0}
+        parent = {source: source}
+        closed = set()
+        while queue:
+            u, _, cost = queue.pop()
+            if u in targets:
+                result = [u]
+                while result[-1] != source:
+                    result.append(parent[result[-1]])
+                result.reverse()
+                return self.expand(result)
+            closed.add(u)
+            maze.states_explored += 1
+            for v, w in self.edges[u].items():
+                if v not in closed and cost + w < g.get(v, cost + w + 1):
+                    g[v] = cost + w
+                    parent[v] = u
+                    queue.push(v, cost + w + heuristic(v), cost + w)
+        return []
+
+def junction_graph(maze):
+    """Returns the reduced graph of `maze`, cached on the maze"""
+    return maze.cached('junction_graph', lambda: JunctionGraph(maze))
@@ -0,0 +1,35 @@
+# fields.py
+# ---------------
+# Licensing Information:  You are free to use or extend this projects for
+# educational purposes provided that (1) you do not distribute or publish
+# solutions, (2) you retain this notice, and (3) you provide clear
+# attribution to the University of Illinois at Urbana-Champaign
+
+"""
+This file contains BFS distance fields: compact uint32 arrays holding the maze distance
+from one source cell to every cell id, shared by the heuristics in `search.py` and the
+landmark index in `landmarks.py`.
+"""
+
+from array import array
+from collections import deque
+
+UNREACHABLE = 0xFFFFFFFF
+
+def distance_field(maze, source):
+    """
+    Runs a BFS from cell id `source` over the whole maze as preprocessing.
+
+    @return field: a uint32 array of maze distances from `source` to every cell id, UNREACHABLE for cells it cannot reach
+    """
+    field = array('I', [UNREACHABLE]) * (maze.size.x * maze.size.y)
+    field[source] = 0
+    frontier = deque((source,))
+    while frontier:
+        k = frontier.popleft()
+        d = field[k] + 1
+        for x in maze.adjacent_ids(k):
+            if field[x] == UNREACHABLE:
+                field[x] = d
+                frontier.append(x)
+    return field
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+# generate.py
+# ---------------
+# Licensing Information:  You are free to use or extend this projects for
+# educational purposes provided that (1) you do not distribute or publish
+# solutions, (2) you retain this notice, and (3) you provide clear
+# attribution to the University of Illinois at Urbana-Champaign
+
+"""
+This file generates synthetic mazes in the MP1 file format, for workloads larger than the
+ones in `data/`. Two layouts are available: `open` scatters single wall cells with a given
+density, and `maze` carves a perfect maze of one-cell corridors (recursive backtracker)
+and then knocks out a fraction `density` of its inner walls to add loops. The start and
+the waypoints are always placed in the same connected region, so every maze is solvable.
+"""
+
+import argparse, random
+from collections import deque
+
+def generate(rows, cols, density = 0.2, layout = 'open', waypoints = 1, seed = None,
+        legend = {'wall': '%', 'start': 'P', 'waypoint': '.'}):
+    """
+    Generates a maze of `rows` x `cols` cells, borders included.
+
+    @return lines: the maze rows as strings
+    """
+    if rows < 3 or cols < 3:
+        raise ValueError('maze dimensions ({0}, {1}) must be at least (3, 3)'.format(rows, cols))
+    rng = random.Random(seed)
+    if layout == 'open':
+        grid = [[i in (0, rows - 1) or j in (0, cols - 1) or rng.random() < density
+            for j in range(cols)] for i in range(rows)]
+    elif layout == 'maze':
+        grid = carve(rows, cols, rng)
+        for i in range(1, rows - 1):
+            for j in range(1, cols - 1):
+                if grid[i][j] and (i % 2 or j % 2) and rng.random() < density:
+                    grid[i][j] = False
+    else:
+        raise ValueError('unknown layout \'{0}\''.format(layout))
+
+    free = [(i, j) for i in range(1, rows - 1) for j in range(1, cols - 1) if not grid[i][j]]
+    if not free:
+        raise ValueError('maze has no open cells, lower the density')
+    start = rng.choice(free)
+    region = reachable(grid, start)
+    region.discard(start)
+    if len(region) < waypoints:
+        raise ValueError('region around the start has only {0} open cells for {1} waypoints'.format(len(region), waypoints))
+
+    lines = [[legend['wall'] if wall else ' ' for wall in row] for row in grid]
+    lines[start[0]][start[1]] = legend['start']
+    for i, j in rng.sample(sorted(region), waypoints):
+        lines[i][j] = legend['waypoint']
+    return [''.join(line) for line in lines]
+
+def carve(rows, cols, rng):
+    # cells at odd coordinates are rooms, the walls between neighboring rooms are knocked out
+    # along a randomized depth-first traversal
+    grid = [[True] * cols for _ in range(rows)]
+    grid[1][1] = False
+    stack = [(1, 1)]
+    while stack:
+        i, j = stack[-1]
+        options = [(i + di, j + dj) for di, dj in ((2, 0), (-2, 0), (0, 2), (0, -2))
+            if 0 < i + di < rows - 1 and 0 < j + dj < cols - 1 and grid[i + di][j + dj]]
+        if not options:
+            stack.pop()
+            continue
+        a, b = rng.choice(options)
+        grid[(i + a) // 2][(j + b) // 2] = False
+        grid[a][b] = False
+        stack.append((a, b))
+    return grid
+
+def reachable(grid, start):
+    seen = {start}
+    frontier = deque((start, ))
+    while frontier:
+        i, j = frontier.popleft()
+        for x in ((i + 1, j), (i - 1, j), (i, j + 1), (i, j - 1)):
+            if not grid[x[0]][x[1]] and x not in seen:
+                seen.add(x)
+                frontier.append(x)
+    return seen
+
+def write(path, lines):
+    with open(path, 'w') as file:
+        file.write('\n'.join(lines) + '\n')
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description     = 'CS440 MP1 maze generator',
+        formatter_class = argparse.ArgumentDefaultsHelpFormatter)
+
+    parser.add_argument('path',
+                        help = 'output maze file')
+    parser.add_argument('--rows', dest = 'rows', type = int, default = 101,
+                        help = 'number of rows, borders included')
+    parser.add_argument('--cols', dest = 'cols', type = int, default = 101,
+                        help = 'number of columns, borders included')
+    parser.add_argument('--density', dest = 'density', type = float, default = 0.2,
+                        help = 'wall density for `open`, fraction of inner walls removed for `maze`')
+    parser.add_argument('--layout', dest = 'layout', type = str, default = 'open', choices = ('open', 'maze'),
+                        help = 'scattered obstacles or carved corridors')
+    parser.add_argument('--waypoints', dest = 'waypoints', type = int, default = 1,
+                        help = 'number of waypoints')
+    parser.add_argument('--seed', dest = 'seed', type = int, default = None,
+                        help = 'random seed')
+
+    arguments = parser.parse_args()
+    write(arguments.path, generate(arguments.rows, arguments.cols, arguments.density,
+        arguments.layout, arguments.waypoints, arguments.seed))
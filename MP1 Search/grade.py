@@ -1,8 +1,16 @@
 #!/usr/bin/env python3
-import pprint, argparse, pickle, json
+import pprint, argparse, pickle, json, time
+import multiprocessing
+from multiprocessing.connection import wait
 
 import maze 
 
+try:
+    import resource
+except ImportError:
+    # not available on Windows, where peak memory is not recorded
+    resource = None
+
 # ------------------------------
 # For every part and every map we run the corresponding algorithm
 #   Some credit is given for finding a correct solution
@@ -32,6 +40,12 @@ if __name__ == "__main__":
 
     parser.add_argument('--gradescope', default = False, action = 'store_true',
                         help = 'save output in gradescope-readable json file')
+    parser.add_argument('--jobs', dest = 'jobs', type = int, default = None,
+                        help = 'run each case in its own process, this many at a time')
+    parser.add_argument('--timeout', dest = 'timeout', type = float, default = None,
+                        help = 'wall-clock seconds allowed per case (implies --jobs 1 if --jobs is not given)')
+    parser.add_argument('--cache', dest = 'cache', type = str, default = None,
+                        help = 'reuse search results stored in this directory for unchanged mazes and code')
 
     arguments   = parser.parse_args()
     
@@ -46,8 +60,9 @@ if __name__ == "__main__":
             print(message)
         raise SystemExit
 
-def generate_answer_key(path, mazes, solutions):
-    key_instructor  = tuple({case: (getattr(search, solution)(maze), maze.states_explored)
+def generate_answer_key(path, mazes, solutions, cache = None):
+    solve = cache.solve if cache is not None else lambda maze, solution: getattr(search, solution)(maze)
+    key_instructor  = tuple({case: (solve(maze, solution), maze.states_explored)
         for case, maze in mazes.items()}
         for mazes, solution in zip(mazes, solutions))
     key_student     = tuple({case: (len(sol[0]), sol[1]) for case, sol in part.items()} 
@@ -62,10 +77,93 @@ def load_answer_key(path):
         print('running in student mode (instructor key unavailable)')
         return pickle.load(open(path['student'],    'rb'))
 
-def grade_optimal(name, key, mazes, solution, weight = 1):
+def run_case(maze, solution, cache = None, memory = False):
+    """
+    Runs `search.<solution>` on `maze`, or looks it up in `cache` (a `cache.SolutionCache`) if given,
+    recording the elapsed time and, with `memory`, the peak resident memory (KB) of this process.
+    The peak covers everything the process has run, so it is only recorded for a process running
+    a single case, and is None otherwise or where `resource` is unavailable.
+    """
+    time_start = time.perf_counter()
+    z = cache.solve(maze, solution) if cache is not None else getattr(search, solution)(maze)
+    return {
+        'path'              : z, 
+        'states_explored'   : maze.states_explored, 
+        'elapsed'           : time.perf_counter() - time_start, 
+        'peak_memory'       : resource.getrusage(resource.RUSAGE_SELF).ru_maxrss if memory and resource else None, 
+    }
+
+def run_worker(connection, path, solution, cache = None):
+    global search
+    import search 
+    # a forked worker starts from the peak of the grader at the time of the fork
+    connection.send(run_case(maze.Maze(path), solution, cache, memory = True))
+    connection.close()
+
+def run_cases(paths, solutions, jobs = None, timeout = None, cache = None):
+    """
+    Runs every (maze file, solution) case, returning one dict per part from case to `run_case` result.
+    Without `jobs` or `timeout` the cases run serially in this process and peak memory is not 
+    recorded. Otherwise each case runs in a fresh process, at most `jobs` at a time, and is 
+    terminated after `timeout` seconds, which gives it a result of None. Results stored in 
+    `cache` are reused instead of searching.
+    """
+    if jobs is None and timeout is None:
+        return tuple({case: run_case(maze.Maze(path), solution, cache) for case, path in part.items()} 
+            for part, solution in zip(paths, solutions))
+    
+    pending = [(index, case, path, solution) for index, (part, solution) in enumerate(zip(paths, solutions)) 
+        for case, path in part.items()]
+    pending.reverse()
+    results = tuple({} for _ in paths)
+    running = {}
+    while pending or running:
+        while pending and len(running) < (jobs or 1):
+            index, case, path, solution = pending.pop()
+            receiver, sender = multiprocessing.Pipe(duplex = False)
+            process = multiprocessing.Process(target = run_worker, args = (sender, path, solution, cache), daemon = True)
+            process.start()
+            sender.close()
+            running[receiver] = (index, case, process, time.monotonic())
+        
+        deadline = min(started for _, _, _, started in running.values()) + timeout if timeout is not None else None
+        for receiver in wait(list(running), None if deadline is None else max(0, deadline - time.monotonic())):
+            index, case, process, _ = running.pop(receiver)
+            try:
+                results[index][case] = receiver.recv()
+            except EOFError:
+                results[index][case] = None
+            process.join()
+        for receiver, (index, case, process, started) in list(running.items()):
+            if timeout is not None and time.monotonic() - started >= timeout:
+                process.terminate()
+                process.join()
+                del running[receiver]
+                results[index][case] = None
+    return tuple({case: part[case] for case in paths[index]} for index, part in enumerate(results))
+
+def case_failure(timeout):
+    if timeout is None:
+        return 'search process exited without a result'
+    return 'search did not finish within {} seconds, or its process exited without a result'.format(timeout)
+
+def extra_data(run):
+    return {'elapsed': run['elapsed'], 'peak_memory': run['peak_memory']}
+
+def grade_optimal(name, key, mazes, runs, weight = 1, timeout = None):
     def grade(case, maze):
         path, states_explored = key[case]
-        z = getattr(search, solution)(maze)
+        run = runs[case]
+        if run is None:
+            return tuple({
+                'name'      : '{0}: {1} for \'{2}\' maze'.format(name, test, case),
+                'output'    : case_failure(timeout),
+                'score'     : 0,
+                'max_score' : points * weight,
+                'visibility': 'visible'
+            } for test, points in (('`validate_path(_:)`', 2), ('not too many states explored', 1), ('correct path length', 2)))
+        z = run['path']
+        maze.states_explored = run['states_explored']
         # check that the path is valid 
         ret_valid = maze.validate_path(z)
         score_validity  = int(ret_valid is None)
@@ -84,30 +182,43 @@ def grade_optimal(name, key, mazes, solution, weight = 1):
                 'output'    : 'Your path is valid' if score_validity else "Your path is not valid, error: {}".format(ret_valid),
                 'score'     : 2 * weight * score_validity,
                 'max_score' : 2 * weight,
-                'visibility': 'visible'
+                'visibility': 'visible',
+                'extra_data': extra_data(run)
             },
             {
                 'name'      : '{0}: not too many states explored for \'{1}\' maze'.format(name, case),
                 'output'    : 'You explored {} states, you should explore fewer than 1.1 * {}'.format(maze.states_explored, states_explored),
                 'score'     : weight * score_explored,
                 'max_score' : weight,
-                'visibility': 'visible'
+                'visibility': 'visible',
+                'extra_data': extra_data(run)
             },
             {
                 'name'      : '{0}: correct path length for \'{1}\' maze'.format(name, case),
                 'output'    : 'Your path length is {}, the correct length is {}'.format(len(z), true_len),
                 'score'     : 2 * weight * score_length,
                 'max_score' : 2 * weight,
-                'visibility': 'visible'
+                'visibility': 'visible',
+                'extra_data': extra_data(run)
             },
         )
             
     return tuple(item for case, maze in mazes.items() for item in grade(case, maze))
 
-def grade_suboptimal(name, key, mazes, solution):
+def grade_suboptimal(name, key, mazes, runs, timeout = None):
     def grade(case, maze):
         path, states_explored = key[case]
-        z = getattr(search, solution)(maze)
+        run = runs[case]
+        if run is None:
+            return tuple({
+                'name'      : '{0}: {1} for \'{2}\' maze'.format(name, test, case),
+                'output'    : case_failure(timeout),
+                'score'     : 0,
+                'max_score' : points,
+                'visibility': 'visible'
+            } for test, points in (('`validate_path(_:)`', 2), ('not too many states explored', 4), ('correct path length', 4)))
+        z = run['path']
+        maze.states_explored = run['states_explored']
         # check that the path is valid 
         ret_valid = maze.validate_path(z)
         score_validity  = int(ret_valid is None)
@@ -127,27 +238,30 @@ def grade_suboptimal(name, key, mazes, solution):
                 'output'    : 'Your path is valid' if score_validity else "Your path is not valid, error: {}".format(ret_valid),
                 'score'     : 2 * score_validity,
                 'max_score' : 2,
-                'visibility': 'visible'
+                'visibility': 'visible',
+                'extra_data': extra_data(run)
             },
             {
                 'name'      : '{0}: not too many states explored for \'{1}\' maze'.format(name, case),
                 'output'    : 'You explored {} states, you should explore fewer than 1.2 * {}'.format(maze.states_explored, states_explored),
                 'score'     : 4 * score_explored,
                 'max_score' : 4,
-                'visibility': 'visible'
+                'visibility': 'visible',
+                'extra_data': extra_data(run)
             },
             {
                 'name'      : '{0}: correct path length for \'{1}\' maze'.format(name, case),
                 'output'    : 'Your path length is {}, it should be less than 1.2 * {}'.format(len(z), sol_len),
                 'score'     : 4 * score_length,
                 'max_score' : 4,
-                'visibility': 'visible'
+                'visibility': 'visible',
+                'extra_data': extra_data(run)
             },
         )
             
     return tuple(item for case, maze in mazes.items() for item in grade(case, maze))
 
-def main():    
+def main(jobs = None, timeout = None, cache = None):    
     solutions = ('bfs', 'astar_single', 'astar_multiple', 'fast')
     for solution in solutions:
         if not hasattr(search, solution):
@@ -155,27 +269,29 @@ def main():
         if not callable(getattr(search, solution)):
             return fail('member \'{0}\' in module \'search\' is not callable'.format(solution))
     
-    mazes = (
+    paths = (
         # part 1 (BFS): 25 points total, 5 points per case
-        {case: maze.Maze('data/part-1/{0}'.format(case))
+        {case: 'data/part-1/{0}'.format(case)
             for case in ('tiny', 'small', 'open', 'no_obs')}, # 'medium', 'large',
         # part 2 (astar_single): 25 points total, 5 points per case 
-        {case: maze.Maze('data/part-2/{0}'.format(case))
+        {case: 'data/part-2/{0}'.format(case)
             for case in ('tiny', 'small', 'open')}, # 'medium', 'large',
         # part 3 (astar_multi): 40 points total, 10 points per case 
-        {case: maze.Maze('data/part-3/{0}'.format(case))
+        {case: 'data/part-3/{0}'.format(case)
             for case in ('tiny', 'open', 'corner', 'one_d')}, # 'cross', 'small', 'medium',
         # part 4: 10 points total, 10 points per case 
-        #{case: maze.Maze('data/part-4/{0}'.format(case))
+        #{case: 'data/part-4/{0}'.format(case)
         #    for case in ('large',)},
     )
+    mazes = tuple({case: maze.Maze(path) for case, path in part.items()} for part in paths)
     
     #generate_answer_key({'instructor': 'key_i', 'student': 'key_s'}, mazes, solutions)
     key             = load_answer_key({'instructor': 'key_i', 'student': 'key_s'})
+    runs            = run_cases(paths, solutions, jobs, timeout, cache)
     first_parts    = tuple(item for i, points in zip(range(0, 3), (1, 1, 1))
-        for item in grade_optimal('part-{0}'.format(i + 1), key[i], mazes[i], solutions[i], 
-            weight = points))
-    #last_part      = tuple(item for i in range(3, 4) for item in grade_suboptimal('part-{0}'.format(i + 1), key[i], mazes[i], solutions[i]))
+        for item in grade_optimal('part-{0}'.format(i + 1), key[i], mazes[i], runs[i], 
+            weight = points, timeout = timeout))
+    #last_part      = tuple(item for i in range(3, 4) for item in grade_suboptimal('part-{0}'.format(i + 1), key[i], mazes[i], runs[i], timeout = timeout))
     
     # construct grade dictionary for gradescope 
     return {
@@ -185,10 +301,12 @@ def main():
     } 
     
 if __name__ == "__main__":
-    results     = main()
+    if arguments.cache is not None:
+        from cache import SolutionCache
+    results     = main(arguments.jobs, arguments.timeout, 
+        SolutionCache(arguments.cache) if arguments.cache is not None else None)
     if arguments.gradescope:
         with open('results.json', 'w') as file:
             file.write(json.dumps(results))
     else:
         pprint.pprint(results)
-    
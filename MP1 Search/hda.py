@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+# hda.py
+# ---------------
+# Licensing Information:  You are free to use or extend this projects for
+# educational purposes provided that (1) you do not distribute or publish
+# solutions, (2) you retain this notice, and (3) you provide clear
+# attribution to the University of Illinois at Urbana-Champaign
+
+"""
+This file contains hash-distributed A* (HDA*) for multiple objectives. Every (cell id,
+remaining mask) state is owned by one worker process, chosen by hashing the state; each
+worker keeps the open list, g values and parents of its own states, expands them, and sends
+generated states it does not own to their owners in batches. A goal popped by any worker
+becomes the incumbent, and the search ends once no worker has a state with f below the
+incumbent and no batch is in flight, so the result is still optimal. Workers are forked,
+so the maze and heuristic are shared with the parent without copying.
+"""
+
+import argparse, multiprocessing, os, queue, time
+
+from pqueue import IndexedHeap
+
+BATCH = 16  # expansions between flushes of the outgoing batches
+
+def owner(state, workers):
+    return (state[0] * 0x9E3779B1 + state[1]) % workers
+
+def work(index, maze, heuristic, bits, inboxes, replies, sent, received, idle, expanded, incumbent, goal, done):
+    workers     = len(inboxes)
+    inbox       = inboxes[index]
+    open_list   = IndexedHeap()
+    g           = {}
+    parent      = {}
+    outboxes    = [[] for _ in range(workers)]
+
+    def relax(state, cost, previous):
+        if cost < g.get(state, cost + 1):
+            g[state] = cost
+            parent[state] = previous
+            open_list.push(state, cost + heuristic( * state ), cost)
+
+    def flush():
+        for x, batch in enumerate(outboxes):
+            if batch:
+                # counted before sending, so the batch is in flight until its owner counts it
+                sent[index] += len(batch)
+                inboxes[x].put(batch)
+                outboxes[x] = []
+
+    count = 0
+    request = ()
+    while not done.is_set():
+        active = open_list and open_list.peek()[1] < incumbent.value
+        if not active:
+            flush()
+            idle[index] = 1
+        try:
+            message = inbox.get_nowait() if active else inbox.get(timeout = 0.001)
+        except queue.Empty:
+            message = ()
+        if isinstance(message, list):
+            idle[index] = 0
+            received[index] += len(message)
+            for state, cost, previous in message:
+                relax(state, cost, previous)
+            continue
+        if message != ():
+            # parent lookups and the stop signal are only sent once the search is over
+            request = message
+            break
+        if not active:
+            continue
+
+        state, _, cost = open_list.pop()
+        if state[1] == 0:
+            with incumbent.get_lock():
+                if cost < incumbent.value:
+                    incumbent.value = cost
+                    goal.value = state[0]
+            continue
+        count += 1
+        for i in maze.adjacent_ids(state[0]):
+            nei = (i, state[1] & ~bits.get(i, 0))
+            x = owner(nei, workers)
+            if x == index:
+                relax(nei, cost + 1, state)
+            else:
+                outboxes[x].append((nei, cost + 1, state))
+        if count % BATCH == 0:
+            flush()
+    expanded[index] = count
+
+    # answer parent lookups for tracing the path until told to stop
+    while request is not None:
+        if request != ():
+            replies.put(parent[request])
+        request = inbox.get()
+
+def check(processes):
+    if any(process.exitcode is not None for process in processes):
+        raise RuntimeError('HDA* worker process exited during the search')
+
+def reply(replies, processes):
+    while True:
+        try:
+            return replies.get(timeout = 0.1)
+        except queue.Empty:
+            check(processes)
+
+def hda_star(maze, heuristic, bits, workers = None):
+    """
+    Runs HDA* from the start of `maze` until every waypoint in the `bits` masks is visited.
+    Expansions of all workers are added to `maze.states_explored`.
+
+    @param heuristic: h(cell id, remaining mask), consistent for the result to be optimal
+    @param bits: dict from waypoint cell id to its bit in the remaining mask
+    @param workers: number of worker processes (default: CPU count)
+
+    @return path: a list of tuples containing the coordinates of each state in the computed path
+    """
+    workers     = workers or os.cpu_count() or 1
+    context     = multiprocessing.get_context('fork')
+    inboxes     = [context.Queue() for _ in range(workers)]
+    replies     = context.Queue()
+    sent        = context.Array('q', workers + 1, lock = False)
+    received    = context.Array('q', workers, lock = False)
+    idle        = context.Array('b', workers, lock = False)
+    expanded    = context.Array('q', workers, lock = False)
+    incumbent   = context.Value('d', float('inf'))
+    goal        = context.Value('q', -1, lock = False)
+    done        = context.Event()
+
+    start = (maze.index( * maze.start ), (1 << len(maze.waypoints)) - 1)
+    sent[workers] = 1
+    inboxes[owner(start, workers)].put([(start, 0, None)])
+    processes = [context.Process(target = work, daemon = True, args = (index, maze, heuristic, bits,
+        inboxes, replies, sent, received, idle, expanded, incumbent, goal, done)) for index in range(workers)]
+    for process in processes:
+        process.start()
+
+    try:
+        # the search is over when two snapshots in a row see every worker idle, every sent
+        # state received and no change in between, since workers only wake up on receiving
+        previous = None
+        while True:
+            time.sleep(0.001)
+            check(processes)
+            snapshot = (all(idle), sum(sent), sum(received))
+            if snapshot[0] and snapshot[1] == snapshot[2] and snapshot == previous:
+                break
+            previous = snapshot
+        done.set()
+
+        result = []
+        state = (goal.value, 0) if incumbent.value < float('inf') else None
+        while state is not None:
+            result.append(maze.cell(state[0]))
+            inboxes[owner(state, workers)].put(state)
+            state = reply(replies, processes)
+        result.reverse()
+        for inbox in inboxes:
+            inbox.put(None)
+        for process in processes:
+            process.join()
+    finally:
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+    maze.states_explored += sum(expanded)
+    return result
+
+def speedup(path, counts, repeat = 1):
+    """
+    Times `search.astar_multiple` and `search.hda_star` with each worker count in `counts` on
+    the maze file at `path`, best of `repeat` runs each.
+
+    @return rows: dicts with the method, workers, seconds, states explored, path length and speedup over the serial run
+    """
+    import maze, search
+    rows = []
+    for method, workers in [('astar_multiple', 1)] + [('hda_star', x) for x in counts]:
+        best = None
+        for _ in range(repeat):
+            instance = maze.Maze(path)
+            # distance fields are preprocessing shared by both methods
+            search.waypoint_fields(instance)
+            start = time.perf_counter()
+            result = search.astar_multiple(instance) if method == 'astar_multiple' else search.hda_star(instance, workers)
+            elapsed = time.perf_counter() - start
+            if best is None or elapsed < best['seconds']:
+                best = {'method': method, 'workers': workers, 'seconds': elapsed,
+                    'states_explored': instance.states_explored, 'path_length': len(result),
+                    'valid': instance.validate_path(result) is None}
+        best['speedup'] = rows[0]['seconds'] / best['seconds'] if rows else 1.0
+        rows.append(best)
+    return rows
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description     = 'CS440 MP1 HDA* speedup report',
+        formatter_class = argparse.ArgumentDefaultsHelpFormatter)
+
+    parser.add_argument('path',
+                        help = 'path to maze file')
+    parser.add_argument('--workers', dest = 'workers', type = lambda text: [int(x) for x in text.split(',')],
+                        default = [1, 2, 4, 8], help = 'comma separated worker counts')
+    parser.add_argument('--repeat', dest = 'repeat', type = int, default = 1,
+                        help = 'runs per configuration, the fastest is reported')
+
+    arguments = parser.parse_args()
+    for row in speedup(arguments.path, arguments.workers, arguments.repeat):
+        print('{method:>14} {workers:>3} workers {seconds:9.3f}s {states_explored:>9} states '
+            'length {path_length:>5} valid {valid!s:>5} speedup {speedup:5.2f}x'.format( ** row ))
@@ -0,0 +1,238 @@
+# hpa.py
+# ---------------
+# Licensing Information:  You are free to use or extend this projects for
+# educational purposes provided that (1) you do not distribute or publish
+# solutions, (2) you retain this notice, and (3) you provide clear
+# attribution to the University of Illinois at Urbana-Champaign
+
+"""
+This file contains a hierarchical (HPA*) abstraction of a maze. The grid is cut into
+square clusters, entrances between neighboring clusters become abstract nodes, and the
+distances between the nodes of each cluster are cached once. Queries search the small
+abstract graph, refine each abstract edge with a BFS inside one cluster and then shorten
+the result along straight runs of open cells. Endpoints in the same or neighboring clusters
+are also searched directly within those two clusters, since the detour through an entrance
+is worst for them. Paths are near-optimal rather than optimal.
+"""
+
+from array import array
+from collections import deque
+
+from pqueue import IndexedHeap
+
+RAY = 4     # smoothing looks this many cluster sizes along straight runs
+
+class Abstraction:
+    """
+    Abstract graph over the entrances of `size` x `size` clusters of `maze`, keyed by cell id.
+    """
+    def __init__(self, maze, size = 16):
+        self.maze   = maze
+        self.size   = size
+        self.nodes  = {}    # cluster -> list of abstract cell ids inside it
+        self.edges  = {}    # cell id -> {cell id: cost}
+        
+        # cluster number of every cell id
+        m, n        = maze.size.x, maze.size.y
+        columns     = (m + size - 1) // size
+        self._columns = columns
+        self._owner = array('i', (i // size * columns + j // size for i in range(n) for j in range(m)))
+        self._build_entrances()
+        self._build_intra_edges()
+
+    def cluster(self, k):
+        return self._owner[k]
+
+    def _add_edge(self, u, v, cost):
+        for a, b in ((u, v), (v, u)):
+            if a not in self.edges:
+                self.edges[a] = {}
+                self.nodes.setdefault(self.cluster(a), []).append(a)
+            if cost < self.edges[a].get(b, cost + 1):
+                self.edges[a][b] = cost
+
+    def _build_entrances(self):
+        m, n    = self.maze.size.x, self.maze.size.y
+        free    = self._free = self.maze.free_mask()
+        c       = self.size
+        # each border is scanned as runs of cell pairs (u, v) that are open on both sides
+        borders = [[(i * m + j, (i + 1) * m + j) for j in range(m)] for i in range(c - 1, n - 1, c)] + \
+                  [[(i * m + j, i * m + j + 1) for i in range(n)] for j in range(c - 1, m - 1, c)]
+        for border in borders:
+            run = []
+            for t, (u, v) in enumerate(border):
+                if free[u] and free[v] and (t % c or not run):
+                    run.append((u, v))
+                    continue
+                self._add_transitions(run)
+                run = [(u, v)] if free[u] and free[v] else []
+            self._add_transitions(run)
+
+    def _add_transitions(self, run):
+        # short entrances get one transition in the middle, long ones one at each end
+        if len(run) >= 6:
+            self._add_edge( * run[0] , 1)
+            self._add_edge( * run[-1] , 1)
+        elif run:
+            self._add_edge( * run[len(run) // 2] , 1)
+
+    def _build_intra_edges(self):
+        for nodes in self.nodes.values():
+            for u in nodes:
+                dist, _ = self.local_bfs(u, nodes, self.maze.adjacent_ids)
+                for v in nodes:
+                    if v != u and v in dist:
+                        self._add_edge(u, v, dist[v])
+
+    def neighboring(self, a, b):
+        """Returns whether clusters `a` and `b` are the same or share a border"""
+        (i, j), (p, q) = divmod(a, self._columns), divmod(b, self._columns)
+        return abs(i - p) + abs(j - q) <= 1
+
+    def local_bfs(self, source, targets, adjacent, clusters = None):
+        """
+        BFS from `source` that never leaves its cluster, or the given `clusters`, stopping once
+        every target is reached.
+
+        @return dist, parent: dicts over the reached cell ids
+        """
+        owner   = self._owner
+        allowed = clusters or (owner[source], )
+        targets = set(targets) - {source}
+        dist    = {source: 0}
+        parent  = {source: source}
+        frontier = deque((source,))
+        while frontier and targets:
+            k = frontier.popleft()
+            for x in adjacent(k):
+                if x not in dist and owner[x] in allowed:
+                    dist[x] = dist[k] + 1
+                    parent[x] = k
+                    targets.discard(x)
+                    frontier.append(x)
+        return dist, parent
+
+    def _connect(self, k, extra, also = ()):
+        # temporarily links a query endpoint to the abstract nodes of its cluster
+        nodes = self.nodes.get(self.cluster(k), [])
+        dist, _ = self.local_bfs(k, list(nodes) + list(also), self.maze.neighbor_ids)
+        for v in nodes:
+            if v != k and v in dist:
+                extra.setdefault(k, {})[v] = dist[v]
+                extra.setdefault(v, {})[k] = dist[v]
+        return dist
+
+    def path(self, source, target):
+        """
+        Finds a path between two cell ids through the abstract graph and refines it.
+
+        @return path: a list of cell ids from `source` to `target` without repeated cells, or [] if none was found
+        """
+        maze = self.maze
+        m = maze.size.x
+        extra = {}
+        same = self.cluster(source) == self.cluster(target)
+        dist = self._connect(source, extra, (target, ) if same else ())
+        self._connect(target, extra)
+        if target in dist:
+            extra.setdefault(source, {})[target] = dist[target]
+
+        ti, tj = divmod(target, m)
+        heuristic = lambda k: abs(k // m - ti) + abs(k % m - tj)
+        queue = IndexedHeap()
+        queue.push(source, heuristic(source), 0)
+        g = {source: 0}
+        parent = {source: source}
+        closed = set()
+        while queue:
+            u, _, cost = queue.pop()
+            if u == target:
+                break
+            closed.add(u)
+            maze.states_explored += 1
+            for v, w in list(self.edges.get(u, {}).items()) + list(extra.get(u, {}).items()):
+                if v not in closed and cost + w < g.get(v, cost + w + 1):
+                    g[v] = cost + w
+                    parent[v] = u
+                    queue.push(v, cost + w + heuristic(v), cost + w)
+        paths = []
+        if target in parent:
+            abstract = [target]
+            while abstract[-1] != source:
+                abstract.append(parent[abstract[-1]])
+            abstract.reverse()
+            paths.append(without_loops(self.smooth(without_loops(self.refine(abstract)))))
+
+        a, b = self.cluster(source), self.cluster(target)
+        if self.neighboring(a, b):
+            _, parent = self.local_bfs(source, (target, ), maze.neighbor_ids, (a, b))
+            if target in parent:
+                direct = [target]
+                while direct[-1] != source:
+                    direct.append(parent[direct[-1]])
+                paths.append(direct[::-1])
+        return min(paths, key = len, default = [])
+
+    def refine(self, abstract):
+        """Expands consecutive abstract nodes into the cells between them"""
+        result = [abstract[0]]
+        for u, v in zip(abstract, abstract[1:]):
+            if v in self.maze.adjacent_ids(u):
+                result.append(v)
+                continue
+            _, parent = self.local_bfs(u, (v, ), self.maze.neighbor_ids)
+            leg = [v]
+            while leg[-1] != u:
+                leg.append(parent[leg[-1]])
+            result.extend(reversed(leg[:-1]))
+        return result
+
+    def smooth(self, path):
+        """
+        Replaces stretches of `path` by straight runs of open cells that rejoin it further on,
+        looking at most `RAY` cluster sizes away in each direction. The result may visit a cell
+        twice where a run crosses the path before the current cell.
+        """
+        m       = self.maze.size.x
+        free    = self._free
+        index   = {k: i for i, k in enumerate(path)}
+        result  = []
+        i       = 0
+        while i < len(path):
+            k = path[i]
+            result.append(k)
+            best = None     # (cells saved, index rejoined, direction, steps)
+            for d in (m, -m, 1, -1):
+                x = k
+                for steps in range(1, RAY * self.size + 1):
+                    x += d
+                    if not free[x]:
+                        break
+                    j = index.get(x, -1)
+                    if j - i - steps > 0 and (best is None or j - i - steps > best[0]):
+                        best = (j - i - steps, j, d, steps)
+            if best is None:
+                i += 1
+                continue
+            _, j, d, steps = best
+            result.extend(k + d * s for s in range(1, steps))
+            i = j
+        return result
+
+def without_loops(path):
+    """Cuts out every loop of a path so that no cell appears twice"""
+    result = []
+    index = {}
+    for k in path:
+        if k in index:
+            for x in result[index[k] + 1:]:
+                del index[x]
+            del result[index[k] + 1:]
+            continue
+        index[k] = len(result)
+        result.append(k)
+    return result
+
+def abstraction(maze, size = 16):
+    """Returns the abstraction of `maze` for the given cluster size, cached on the maze"""
+    return maze.cached(('abstraction', size), lambda: Abstraction(maze, size))
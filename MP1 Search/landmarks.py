@@ -0,0 +1,115 @@
+# landmarks.py
+# ---------------
+# Licensing Information:  You are free to use or extend this projects for
+# educational purposes provided that (1) you do not distribute or publish
+# solutions, (2) you retain this notice, and (3) you provide clear
+# attribution to the University of Illinois at Urbana-Champaign
+
+"""
+This file contains an ALT landmark index for answering many point to point queries on one
+maze. A few landmarks are picked by farthest-point selection and their BFS distance fields
+are kept; by the triangle inequality |d(L, t) - d(L, k)| is a lower bound on d(k, t) for
+every landmark L, which makes a much tighter admissible A* heuristic than manhattan distance.
+The index can be saved next to the maze file so that it is only built once.
+"""
+
+import struct
+import sys
+from array import array
+
+from fields import UNREACHABLE, distance_field
+
+MAGIC   = b'ALT2'
+HEADER  = struct.Struct('<4sIIII40s')   # magic, rows, columns, requested count, landmarks, maze digest
+
+class LandmarkIndex:
+    """
+    Distance fields of `count` landmarks of `maze`, chosen by farthest-point selection from the start.
+    Fewer are chosen when every reachable cell is already a landmark.
+    """
+    def __init__(self, maze, count = 8, landmarks = None, fields = None):
+        self.maze = maze
+        self.count = count
+        if landmarks is None:
+            landmarks, fields = self._select(maze, count)
+        self.landmarks  = tuple(landmarks)
+        self.fields     = tuple(fields)
+
+    @staticmethod
+    def _select(maze, count):
+        # each new landmark is the reachable cell farthest from all landmarks chosen so far
+        nearest     = distance_field(maze, maze.index( * maze.start ))
+        landmarks   = []
+        fields      = []
+        for _ in range(count):
+            k = max(range(len(nearest)), key = lambda x: nearest[x] if nearest[x] != UNREACHABLE else -1)
+            if nearest[k] in (0, UNREACHABLE):
+                break
+            field = distance_field(maze, k)
+            landmarks.append(k)
+            fields.append(field)
+            for x, d in enumerate(field):
+                if d < nearest[x]:
+                    nearest[x] = d
+        return landmarks, fields
+
+    def lower_bound(self, k, target):
+        """Returns the largest landmark lower bound on the maze distance between cell ids `k` and `target`"""
+        bound = 0
+        for field in self.fields:
+            a, b = field[k], field[target]
+            if a != UNREACHABLE and b != UNREACHABLE and abs(a - b) > bound:
+                bound = abs(a - b)
+        return bound
+
+    def save(self, path):
+        """Writes the index as a header followed by the raw int32 landmark ids and uint32 fields"""
+        maze = self.maze
+        with open(path, 'wb') as file:
+            file.write(HEADER.pack(MAGIC, maze.size.y, maze.size.x, self.count, len(self.landmarks), maze.digest().encode()))
+            for data in (array('i', self.landmarks), ) + self.fields:
+                if sys.byteorder == 'big':
+                    data = array(data.typecode, data)
+                    data.byteswap()
+                file.write(data.tobytes())
+
+    @classmethod
+    def load(cls, maze, path, count = 8):
+        """
+        Reads an index written by `save`, returns None if it is missing, was built for other maze
+        contents or for another number of landmarks than `count`
+        """
+        try:
+            with open(path, 'rb') as file:
+                magic, n, m, requested, stored, digest = HEADER.unpack(file.read(HEADER.size))
+                if (magic != MAGIC or (n, m) != (maze.size.y, maze.size.x) or requested != count or
+                        digest.decode() != maze.digest()):
+                    return None
+                landmarks = array('i')
+                landmarks.frombytes(file.read(4 * stored))
+                fields = []
+                for _ in range(stored):
+                    field = array('I')
+                    field.frombytes(file.read(4 * n * m))
+                    fields.append(field)
+        except (OSError, struct.error, ValueError):
+            return None
+        if sys.byteorder == 'big':
+            for data in [landmarks] + fields:
+                data.byteswap()
+        return cls(maze, count, landmarks, fields)
+
+def index(maze, count = 8, path = None):
+    """
+    Returns the landmark index of `maze` with `count` landmarks, cached on the maze. If `path`
+    is given the index is loaded from that file when it matches the maze, and saved there
+    after being built otherwise.
+    """
+    def build():
+        result = LandmarkIndex.load(maze, path, count) if path is not None else None
+        if result is None:
+            result = LandmarkIndex(maze, count)
+            if path is not None:
+                result.save(path)
+        return result
+    return maze.cached(('landmarks', count), build)
@@ -0,0 +1,131 @@
+# loader.py
+# ---------------
+# Licensing Information:  You are free to use or extend this projects for
+# educational purposes provided that (1) you do not distribute or publish
+# solutions, (2) you retain this notice, and (3) you provide clear
+# attribution to the University of Illinois at Urbana-Champaign
+
+"""
+This file contains a NumPy-backed maze loader for very large mazes. The ASCII file is parsed
+into a uint8 grid, the border, start and waypoint checks and the CSR adjacency are computed
+with vectorized operations, and the grid is written to a binary sidecar (a header followed
+by the raw grid) that later loads open with `np.memmap` instead of parsing text again.
+"""
+
+import os
+import struct
+from array import array
+from collections import namedtuple
+
+import numpy as np
+
+from maze import Maze, MazeError
+
+MAGIC   = b'MAZ1'
+HEADER  = struct.Struct('<4sIIqq')
+
+class NumpyMaze(Maze):
+    """
+    Maze whose cells are also available as the uint8 array `self.grid`. `__getitem__`,
+    `navigable`, `waypoints` and the search API behave exactly as for `Maze`.
+    """
+    def __init__(self, path, legend = {'wall': '%', 'start': 'P', 'waypoint': '.'}, cache = True):
+        self._cache = cache
+        super().__init__(path, legend)
+
+    def _parse(self, path):
+        grid = self._read_sidecar(path) if self._cache else None
+        fresh = False
+        if grid is None:
+            with open(path, 'rb') as file:
+                lines = tuple(line.strip() for line in file.read().split(b'\n'))
+            # a trailing newline does not start another row
+            if len(lines) > 1 and not lines[-1]:
+                lines = lines[:-1]
+
+            n = len(lines)
+            m = min(map(len, lines))
+            if any(len(line) != m for line in lines):
+                raise MazeError('(maze \'{0}\'): all maze rows must be the same length (shortest row has length {1})'.format(path, m))
+            grid = np.frombuffer(b''.join(lines), dtype = np.uint8).reshape(n, m)
+            fresh = self._cache
+
+        n, m = grid.shape
+        self.grid       = grid
+        self._storage   = tuple(row.tobytes().decode('latin-1') for row in grid)
+        self.size       = namedtuple('size', ('x', 'y'))(m, n)
+
+        wall = ord(self.legend.wall)
+        if n and m and ((grid[0] != wall).any() or (grid[-1] != wall).any() or (grid[:, 0] != wall).any() or (grid[:, -1] != wall).any()):
+            raise MazeError('(maze \'{0}\'): maze borders must only contain `wall` cells (\'{1}\')'.format(path, self.legend.wall))
+        if n < 3 or m < 3:
+            raise MazeError('(maze \'{0}\'): maze dimensions ({1}, {2}) must be at least (3, 3)'.format(path, n, m))
+
+        starts = np.argwhere(grid == ord(self.legend.start))
+        if len(starts) != 1:
+            raise MazeError('(maze \'{0}\'): maze must contain exactly one `start` cell (\'{1}\') (found {2})'.format(
+                path, self.legend.start, len(starts)))
+        self.start      = tuple(int(x) for x in starts[0])
+        self.waypoints  = tuple((int(i), int(j)) for i, j in np.argwhere(grid == ord(self.legend.waypoint)))
+
+        # only mazes that passed every check are cached
+        if fresh:
+            self._write_sidecar(path, grid)
+
+    @staticmethod
+    def sidecar(path):
+        return path + '.grid'
+
+    def _read_sidecar(self, path):
+        # the sidecar is only trusted if it records the current size and mtime of the maze file
+        try:
+            stat = os.stat(path)
+            with open(self.sidecar(path), 'rb') as file:
+                magic, n, m, mtime, size = HEADER.unpack(file.read(HEADER.size))
+        except (OSError, struct.error):
+            return None
+        if magic != MAGIC or (mtime, size) != (stat.st_mtime_ns, stat.st_size):
+            return None
+        return np.memmap(self.sidecar(path), dtype = np.uint8, mode = 'c', offset = HEADER.size, shape = (n, m))
+
+    def _write_sidecar(self, path, grid):
+        stat = os.stat(path)
+        try:
+            with open(self.sidecar(path) + '.tmp', 'wb') as file:
+                file.write(HEADER.pack(MAGIC, grid.shape[0], grid.shape[1], stat.st_mtime_ns, stat.st_size))
+                file.write(grid.tobytes())
+            os.replace(self.sidecar(path) + '.tmp', self.sidecar(path))
+        except OSError:
+            pass
+
+    def free_mask(self):
+        return bytearray((self.grid != ord(self.legend.wall)).tobytes())
+
+    def _build_adjacency(self):
+        # same order as `Maze._build_adjacency`: down, up, right, left
+        n, m = self.grid.shape
+        free = self.grid != ord(self.legend.wall)
+        ok = np.zeros((n, m, 4), dtype = bool)
+        ok[:-1, :, 0] = free[1:, :]
+        ok[1:, :, 1] = free[:-1, :]
+        ok[:, :-1, 2] = free[:, 1:]
+        ok[:, 1:, 3] = free[:, :-1]
+        ok = ok.reshape(n * m, 4)
+        ids = np.arange(n * m, dtype = np.int32)[:, None] + np.array((m, -m, 1, -1), dtype = np.int32)
+
+        offsets = np.zeros(n * m + 1, dtype = np.int32)
+        np.cumsum(ok.sum(axis = 1), out = offsets[1:])
+        result = array('i'), array('i')
+        result[0].frombytes(offsets.astype(np.intc).tobytes())
+        result[1].frombytes(ids[ok].astype(np.intc).tobytes())
+        return result
+
+    def set_cell(self, i, j, wall):
+        super().set_cell(i, j, wall)
+        if not self.grid.flags.writeable:
+            self.grid = self.grid.copy()
+        self.grid[i, j] = ord(self._storage[i][j])
+
+def load(path, legend = {'wall': '%', 'start': 'P', 'waypoint': '.'}, cache = True):
+    """Loads `path` as a NumpyMaze, reading and writing the binary sidecar unless `cache` is False"""
+    return NumpyMaze(path, legend, cache)
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+# loadtest.py
+# ---------------
+# Licensing Information:  You are free to use or extend this projects for
+# educational purposes provided that (1) you do not distribute or publish
+# solutions, (2) you retain this notice, and (3) you provide clear
+# attribution to the University of Illinois at Urbana-Champaign
+
+"""
+This file is a load-test client for `server.py`. It keeps `concurrency` queries in flight
+over `connections` connections, cycling through the given mazes, and reports throughput,
+latency percentiles and the number of failed queries.
+"""
+
+import argparse, asyncio, itertools, json, os, time
+
+async def run(mazes, method, requests, concurrency, connections, host = '127.0.0.1', port = 8440, unix = None):
+    """
+    Sends `requests` queries and waits for all responses.
+
+    @return report: a dict with the throughput (queries per second), latency percentiles (seconds) and error count
+    """
+    streams = [await (asyncio.open_unix_connection(unix) if unix is not None else asyncio.open_connection(host, port))
+        for _ in range(connections)]
+    waiting = {}
+    latencies = []
+    errors = 0
+    async def receive(reader):
+        nonlocal errors
+        while True:
+            line = await reader.readline()
+            if not line:
+                return
+            response = json.loads(line)
+            # errors about lines the server could not parse come back with a null id
+            future = waiting.pop(response.get('id'), None)
+            if future is None:
+                errors += 1
+            else:
+                future.set_result(response)
+
+    receivers = [asyncio.create_task(receive(reader)) for reader, _ in streams]
+    queue = iter(enumerate(itertools.islice(itertools.cycle(mazes), requests)))
+    async def client(writer):
+        nonlocal errors
+        for i, path in queue:
+            waiting[i] = asyncio.get_running_loop().create_future()
+            start = time.perf_counter()
+            writer.write(json.dumps({'id': i, 'maze': path, 'method': method}).encode() + b'\n')
+            response = await waiting[i]
+            latencies.append(time.perf_counter() - start)
+            errors += 'error' in response
+
+    start = time.perf_counter()
+    await asyncio.gather( * (client(streams[i % connections][1]) for i in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    for task in receivers:
+        task.cancel()
+    for _, writer in streams:
+        writer.close()
+
+    latencies.sort()
+    percentile = lambda p: latencies[min(len(latencies) - 1, int(p / 100 * len(latencies)))] if latencies else None
+    return {
+        'requests'      : len(latencies),
+        'errors'        : errors,
+        'elapsed'       : elapsed,
+        'throughput'    : len(latencies) / elapsed if elapsed else 0,
+        'p50'           : percentile(50),
+        'p90'           : percentile(90),
+        'p99'           : percentile(99),
+        'max'           : latencies[-1] if latencies else None,
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description     = 'CS440 MP1 search server load test',
+        formatter_class = argparse.ArgumentDefaultsHelpFormatter)
+
+    parser.add_argument('mazes', nargs = '+',
+                        help = 'maze files to query, cycled through (sent as absolute paths)')
+    parser.add_argument('--method', dest = 'method', type = str, default = 'astar_single',
+                        help = 'search method')
+    parser.add_argument('--requests', dest = 'requests', type = int, default = 1000,
+                        help = 'total number of queries')
+    parser.add_argument('--concurrency', dest = 'concurrency', type = int, default = 16,
+                        help = 'queries in flight at a time')
+    parser.add_argument('--connections', dest = 'connections', type = int, default = 4,
+                        help = 'connections to the server')
+    parser.add_argument('--host', dest = 'host', type = str, default = '127.0.0.1',
+                        help = 'server address')
+    parser.add_argument('--port', dest = 'port', type = int, default = 8440,
+                        help = 'server TCP port')
+    parser.add_argument('--unix', dest = 'unix', type = str, default = None,
+                        help = 'connect to this Unix socket instead of TCP')
+
+    arguments = parser.parse_args()
+    report = asyncio.run(run([os.path.abspath(x) for x in arguments.mazes],
+        arguments.method, arguments.requests, arguments.concurrency, arguments.connections,
+        arguments.host, arguments.port, arguments.unix))
+    print('{requests} requests, {errors} errors in {elapsed:.2f}s: {throughput:.1f} requests/s'.format( ** report ))
+    if report['requests']:
+        print('latency p50 {p50:.4f}s  p90 {p90:.4f}s  p99 {p99:.4f}s  max {max:.4f}s'.format( ** report ))
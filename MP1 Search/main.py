@@ -182,7 +182,7 @@ if __name__ == "__main__":
     parser.add_argument('path',
                         help = 'path to maze file')
     parser.add_argument('--search', dest = 'search', type = str, default = 'bfs',
-                        choices = ('bfs', 'astar_corner', 'astar_single', 'fast', 'astar_multiple'), 
+                        choices = ('bfs', 'bfs_bidirectional', 'astar_corner', 'astar_single', 'jps_single', 'fast', 'astar_multiple', 'held_karp', 'tour', 'hpa_single', 'hpa_multiple', 'contracted_single', 'contracted_multiple', 'alt_single', 'rsr_bfs', 'rsr_single', 'ida_star', 'sma_star', 'hda_star', 'bfs_wavefront'), 
                         help = 'search method')
     parser.add_argument('--scale',  dest = 'scale', type = int, default = 20,
                         help = 'display scale')
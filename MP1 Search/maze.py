@@ -8,6 +8,8 @@
 # Created by Kelvin Ma (kelvinm2@illinois.edu) on 01/24/2021, 
 # Inspired by previous work by Michael Abir (abir2@illinois.edu) and Rahul Kunji (rahulsk2@illinois.edu)
 
+import hashlib
+from array import array
 from collections import namedtuple
 from itertools import chain 
 
@@ -31,6 +33,27 @@ class Maze:
             legend['start'], 
             legend['waypoint'])
         
+        # Reads and validates the maze, setting self._storage, self.size, self.start and self.waypoints
+        self._parse(path)
+        
+        # Stores the 4-connected adjacency of every cell in compressed sparse row form, 
+        # keyed by flat cell id `i * size.x + j`
+        self._offsets, self._adjacency = self._build_adjacency()
+        
+        # Adjacency of cells touched by `set_cell`, overriding the CSR index, and the ids of 
+        # edited cells in edit order so that caches and planners can tell what changed
+        self._patched   = {}
+        self.edited     = []
+        
+        # values computed from the walls by `cached`, as (len(self.edited) when built, value)
+        self._cached    = {}
+        
+        # there is no point in making this private since anyone trying to cheat 
+        # could simply overwrite the underscored variable
+        self.states_explored    = 0
+    
+    def _parse(self, path):
+        """Reads the ASCII maze at `path` into self._storage and checks its borders, start and waypoints"""
         with open(path) as file:
             lines = tuple(line.strip() for line in file.readlines() if line)
         
@@ -72,10 +95,6 @@ class Maze:
         self.waypoints = tuple((i, j) 
             for i in range(self.size.y) 
             for j in range(self.size.x) if self[i, j] == self.legend.waypoint)
-        
-        # there is no point in making this private since anyone trying to cheat 
-        # could simply overwrite the underscored variable
-        self.states_explored    = 0
     
     def __getitem__(self, index):
         """Access data at index via self[index] instead of using self._storage"""
@@ -98,53 +117,156 @@ class Maze:
         except IndexError:
             return False 
 
+    def _build_adjacency(self):
+        """Builds CSR offsets and an int32 neighbor array, in the same order as `navigable` probing"""
+        m, n    = self.size.x, self.size.y
+        free    = self.free_mask()
+        
+        offsets     = array('i', [0]) 
+        adjacency   = array('i')
+        append      = adjacency.append
+        for i in range(n):
+            base = i * m 
+            for k in range(base, base + m):
+                if i + 1 < n and free[k + m]:
+                    append(k + m)
+                if i > 0 and free[k - m]:
+                    append(k - m)
+                if k + 1 < base + m and free[k + 1]:
+                    append(k + 1)
+                if k > base and free[k - 1]:
+                    append(k - 1)
+                offsets.append(len(adjacency))
+        return offsets, adjacency
+    
+    def free_mask(self):
+        """Returns a bytearray indexed by cell id, 1 for navigable cells and 0 for walls"""
+        return bytearray(c != self.legend.wall for row in self._storage for c in row)
+    
+    def free_rows(self):
+        """Returns one int per row with bit j set when (i,j) is navigable, for bit-parallel searches"""
+        table = bytearray(b'1') * 256
+        table[ord(self.legend.wall)] = ord('0')
+        return [int(row.encode('latin-1').translate(table)[::-1], 2) for row in self._storage]
+    
+    def digest(self):
+        """Returns a hex digest of the current maze contents"""
+        return hashlib.sha1('\n'.join(self._storage).encode()).hexdigest()
+    
+    def index(self, i, j):
+        """Returns the flat cell id of (i,j)"""
+        return i * self.size.x + j 
+    
+    def cell(self, index):
+        """Returns the (row, col) of a flat cell id"""
+        return divmod(index, self.size.x)
+    
+    def adjacent_ids(self, index):
+        """Returns the cell ids adjacent to the given cell id without counting it as an explored state, 
+        for preprocessing that is not part of the search itself"""
+        if index in self._patched:
+            return self._patched[index]
+        return self._adjacency[self._offsets[index] : self._offsets[index + 1]]
+    
+    def neighbor_ids(self, index):
+        """Returns the cell ids that can be moved to from the given cell id"""
+        self.states_explored += 1 
+        if index in self._patched:
+            return self._patched[index]
+        return self._adjacency[self._offsets[index] : self._offsets[index + 1]]
+
     def neighbors(self, i, j):
         """Returns list of neighboing squares that can be moved to from the given row,col"""
         self.states_explored += 1 
-        return tuple(x for x in (
-            (i + 1, j),
-            (i - 1, j),
-            (i, j + 1),
-            (i, j - 1)) 
-            if self.navigable( * x ))
+        m = self.size.x
+        k = i * m + j 
+        if k in self._patched:
+            return tuple(divmod(x, m) for x in self._patched[k])
+        return tuple(divmod(x, m) for x in self._adjacency[self._offsets[k] : self._offsets[k + 1]])
+    
+    def set_cell(self, i, j, wall):
+        """Turns (i,j) into a wall or an open cell, patching the adjacency of it and its neighbors"""
+        if not (0 < i < self.size.y - 1 and 0 < j < self.size.x - 1):
+            raise MazeError('cell ({0}, {1}) is on or outside the maze border and cannot be changed'.format(i, j))
+        if self[i, j] in (self.legend.start, self.legend.waypoint):
+            raise MazeError('cell ({0}, {1}) is the `start` or a `waypoint` and cannot be changed'.format(i, j))
+        
+        row = self._storage[i]
+        self._storage = self._storage[:i] + (row[:j] + (self.legend.wall if wall else ' ') + row[j + 1:], ) + self._storage[i + 1:]
+        for x in ((i, j), (i + 1, j), (i - 1, j), (i, j + 1), (i, j - 1)):
+            self._patched[self.index( * x )] = array('i', (self.index( * y ) for y in (
+                (x[0] + 1, x[1]),
+                (x[0] - 1, x[1]),
+                (x[0], x[1] + 1),
+                (x[0], x[1] - 1)) 
+                if self.navigable( * y )))
+        self.edited.append(self.index(i, j))
+    
+    def cached(self, key, build):
+        """
+        Returns the value stored under `key` for this maze, calling `build()` to compute it on
+        first use and again after `set_cell`, for preprocessing that depends on the walls
+        """
+        entry = self._cached.get(key)
+        if entry is None or entry[0] != len(self.edited):
+            entry = self._cached[key] = (len(self.edited), build())
+        return entry[1]
 
     def validate_path(self, path):
-        # validate type and shape 
-        if len(path) == 0:
-            return 'path must not be empty'
-        if not all(len(vertex) == 2 for vertex in path):
-            return 'each path element must be a two-element sequence'
-        
-        # normalize path in case student used an element type that is not `tuple` 
-        path = tuple(map(tuple, path))
+        # `path` can be any iterable of (row, col) pairs, including a generator, and is checked
+        # in one pass. The first failure of each check is recorded and the most important one
+        # is reported, so the message is the same as checking the whole path check by check.
+        contiguous  = None
+        navigable   = None
+        segment     = None
+        last        = {}    # cell -> (index of its latest visit, waypoints visited before it)
+        count       = 0
+        a           = None
+        i           = -1
+        for i, x in enumerate(path):
+            # validate type and shape 
+            if len(x) != 2:
+                return 'each path element must be a two-element sequence'
+            if contiguous is not None:
+                continue
+            
+            # normalize vertex in case student used an element type that is not `tuple` 
+            x = tuple(x)
 
-        # check if path is contiguous
-        for i, (a, b) in enumerate(zip(path, path[1:])):
-            if sum(abs(b - a) for a, b in zip(a, b)) != 1:
-                return 'path vertex {1} ({4}, {5}) must be exactly one move away from path vertex {0} ({2}, {3})'.format(
-                    i, i + 1, * a , * b )
+            # check if path is contiguous
+            if a is not None and sum(abs(q - p) for p, q in zip(a, x)) != 1:
+                contiguous = 'path vertex {1} ({4}, {5}) must be exactly one move away from path vertex {0} ({2}, {3})'.format(
+                    i - 1, i, * a , * x )
+                continue
+            a = x
+            if navigable is not None:
+                continue
 
-        # check if path is navigable 
-        for i, x in enumerate(path):
+            # check if path is navigable 
             if not self.navigable( * x ):
-                return 'path vertex {0} ({1}, {2}) is not a navigable maze cell'.format(i, * x )
-        
-        # check if path ends at a waypoint 
-        for waypoint in self.waypoints:
-            if path[-1] == waypoint:
-                break 
-        else:
-            return 'last path vertex {0} ({1}, {2}) must be a waypoint'.format(len(path) - 1, * path[-1] )
+                navigable = 'path vertex {0} ({1}, {2}) is not a navigable maze cell'.format(i, * x )
+                continue
 
-        # check for unnecessary path segments
-        indices = {}
-        for i, x in enumerate(path):
-            if x in indices:
-                if all(self[x] != self.legend.waypoint for x in path[indices[x] : i]):
-                    return 'path segment [{0} : {1}] contains no waypoints'.format(indices[x], i)
-            indices[x] = i 
+            # check for unnecessary path segments, `count` waypoints come before vertex i
+            if segment is None and x in last and last[x][1] == count:
+                segment = 'path segment [{0} : {1}] contains no waypoints'.format(last[x][0], i)
+            last[x] = (i, count)
+            count += self[x] == self.legend.waypoint
+
+        if i < 0:
+            return 'path must not be empty'
+        if contiguous is not None:
+            return contiguous
+        if navigable is not None:
+            return navigable
+
+        # check if path ends at a waypoint 
+        if a not in self.waypoints:
+            return 'last path vertex {0} ({1}, {2}) must be a waypoint'.format(i, * a )
+        if segment is not None:
+            return segment
         
         # check if path contains all waypoints 
         for i, x in enumerate(self.waypoints):
-            if x not in indices:
+            if x not in last:
                 return 'waypoint {0} ({1}, {2}) was never visited'.format(i, * x )
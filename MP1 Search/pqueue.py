@@ -0,0 +1,119 @@
+# pqueue.py
+# ---------------
+# Licensing Information:  You are free to use or extend this projects for
+# educational purposes provided that (1) you do not distribute or publish
+# solutions, (2) you retain this notice, and (3) you provide clear
+# attribution to the University of Illinois at Urbana-Champaign
+
+"""
+This file contains an indexed binary heap used as the open list by the searches in
+`search.py`. Unlike `heapq`, each key appears at most once and its priority can be
+lowered in place, so no stale entries or full re-heapifies are needed.
+"""
+
+class IndexedHeap:
+    """
+    Min-heap of hashable keys ordered by `f`, then by larger `g`, then by insertion order.
+    `push`, `pop` and `decrease_key` are O(log n), `contains` and `priority` are O(1).
+    """
+    def __init__(self):
+        self._heap      = []    # entries (f, -g, sequence, key)
+        self._position  = {}    # key -> index into self._heap
+        self._sequence  = 0
+
+    def __len__(self):
+        return len(self._heap)
+
+    def __contains__(self, key):
+        return key in self._position
+
+    def __iter__(self):
+        return iter(self._position)
+
+    def contains(self, key):
+        return key in self._position
+
+    def peek(self):
+        """Returns the (key, f, g) with the smallest priority without removing it"""
+        f, g, _, key = self._heap[0]
+        return key, f, -g
+
+    def priority(self, key):
+        """Returns the (f, g) currently stored for `key`"""
+        f, g, _, _ = self._heap[self._position[key]]
+        return f, -g
+
+    def push(self, key, f, g = 0):
+        """Inserts `key`, or lowers its priority if it is already queued with a larger one"""
+        if key in self._position:
+            return self.decrease_key(key, f, g)
+        self._heap.append((f, -g, self._sequence, key))
+        self._sequence += 1
+        self._position[key] = len(self._heap) - 1
+        self._sift_up(len(self._heap) - 1)
+        return True
+
+    def decrease_key(self, key, f, g = 0):
+        """Lowers the priority of a queued `key`, returns False if (f, g) would not improve it"""
+        index = self._position[key]
+        entry = self._heap[index]
+        if (f, -g) >= entry[:2]:
+            return False
+        self._heap[index] = (f, -g, entry[2], key)
+        self._sift_up(index)
+        return True
+
+    def remove(self, key):
+        """Removes a queued `key` whatever its priority"""
+        heap = self._heap
+        index = self._position.pop(key)
+        last = heap.pop()
+        if index < len(heap):
+            heap[index] = last
+            self._position[last[3]] = index
+            self._sift_up(index)
+            self._sift_down(self._position[last[3]])
+
+    def pop(self):
+        """Removes and returns the (key, f, g) with the smallest priority"""
+        heap = self._heap
+        last = heap.pop()
+        if heap:
+            top, heap[0] = heap[0], last
+            self._position[last[3]] = 0
+            self._sift_down(0)
+        else:
+            top = last
+        del self._position[top[3]]
+        return top[3], top[0], -top[1]
+
+    def _sift_up(self, index):
+        heap, position = self._heap, self._position
+        entry = heap[index]
+        while index > 0:
+            parent = (index - 1) >> 1
+            if heap[parent] <= entry:
+                break
+            heap[index] = heap[parent]
+            position[heap[index][3]] = index
+            index = parent
+        heap[index] = entry
+        position[entry[3]] = index
+
+    def _sift_down(self, index):
+        heap, position = self._heap, self._position
+        n = len(heap)
+        entry = heap[index]
+        while True:
+            child = 2 * index + 1
+            if child >= n:
+                break
+            if child + 1 < n and heap[child + 1] < heap[child]:
+                child += 1
+            if entry <= heap[child]:
+                break
+            heap[index] = heap[child]
+            position[heap[index][3]] = index
+            index = child
+        heap[index] = entry
+        position[entry[3]] = index
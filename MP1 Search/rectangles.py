@@ -0,0 +1,135 @@
+# rectangles.py
+# ---------------
+# Licensing Information:  You are free to use or extend this projects for
+# educational purposes provided that (1) you do not distribute or publish
+# solutions, (2) you retain this notice, and (3) you provide clear
+# attribution to the University of Illinois at Urbana-Champaign
+
+"""
+This file contains a rectangular symmetry reduction of a maze. The open cells are split into
+empty rectangles, and searches only visit the perimeter cells of each rectangle: a perimeter
+cell keeps its edges to neighboring perimeter cells and gets one macro edge straight across
+its rectangle to the opposite side. All shortest paths through an empty rectangle are
+equivalent, so skipping the interiors keeps shortest paths on the maze while removing most
+of the symmetric equal-cost alternatives that a search of an open room would expand.
+"""
+
+from array import array
+
+from pqueue import IndexedHeap
+
+class Decomposition:
+    """
+    Empty rectangles (top, left, bottom, right), inclusive, covering the open cells of `maze`,
+    grown greedily right and then down from the first uncovered cell in row-major order.
+    """
+    def __init__(self, maze):
+        self.maze       = maze
+        self.rectangles = []
+        m               = maze.size.x
+        free            = maze.free_mask()
+        owner           = array('i', [-1]) * len(free)
+        for k in range(len(free)):
+            if not free[k] or owner[k] >= 0:
+                continue
+            # the maze border is all walls, so both loops stop inside the maze
+            width = 1
+            while free[k + width] and owner[k + width] < 0:
+                width += 1
+            height = 1
+            while all(free[x] and owner[x] < 0 for x in range(k + height * m, k + height * m + width)):
+                height += 1
+            for r in range(height):
+                owner[k + r * m : k + r * m + width] = array('i', [len(self.rectangles)]) * width
+            i, j = divmod(k, m)
+            self.rectangles.append((i, j, i + height - 1, j + width - 1))
+        self.owner = owner
+
+    def interior(self, k):
+        """Returns whether cell id `k` is strictly inside its rectangle"""
+        top, left, bottom, right = self.rectangles[self.owner[k]]
+        i, j = divmod(k, self.maze.size.x)
+        return top < i < bottom and left < j < right
+
+    def edges(self, k):
+        """Returns the (cell id, cost) edges of the perimeter cell `k`"""
+        m = self.maze.size.x
+        top, left, bottom, right = self.rectangles[self.owner[k]]
+        i, j = divmod(k, m)
+        result = [(x, 1) for x in self.maze.adjacent_ids(k) if not self.interior(x)]
+        # macro edges across the rectangle, where the opposite side is not already adjacent
+        if bottom - top > 1 and i in (top, bottom):
+            x = (top + bottom - i) * m + j
+            result.append((x, bottom - top))
+        if right - left > 1 and j in (left, right):
+            x = i * m + left + right - j
+            result.append((x, right - left))
+        return result
+
+    def projections(self, k):
+        """Returns the (cell id, cost) of the perimeter cells straight up, down, left and right of the interior cell `k`"""
+        m = self.maze.size.x
+        top, left, bottom, right = self.rectangles[self.owner[k]]
+        i, j = divmod(k, m)
+        return [(top * m + j, i - top), (bottom * m + j, bottom - i), (i * m + left, j - left), (i * m + right, right - j)]
+
+    def expand(self, ids):
+        """Expands consecutive cell ids of one rectangle into every cell between them, moving along rows first"""
+        m = self.maze.size.x
+        result = [ids[0]]
+        for k in ids[1:]:
+            i, j = divmod(result[-1], m)
+            a, b = divmod(k, m)
+            result.extend(x * m + j for x in (range(i + 1, a + 1) if a > i else range(i - 1, a - 1, -1)))
+            result.extend(a * m + x for x in (range(j + 1, b + 1) if b > j else range(j - 1, b - 1, -1)))
+        return result
+
+    def path(self, source, targets, heuristic = True):
+        """
+        Runs A* (or uniform-cost search without `heuristic`) over the perimeter cells from
+        `source` to the closest of `targets`. Interior sources and targets are joined to the
+        perimeter cells in line with them, and to each other when they share a rectangle.
+
+        @return path: a list of cell ids from `source` to the reached target, or [] if none is reachable
+        """
+        maze = self.maze
+        m = maze.size.x
+        targets = set(targets)
+        goals = [divmod(k, m) for k in targets]
+        distance = lambda a, b: abs(a // m - b // m) + abs(a % m - b % m)
+        estimate = (lambda k: min(abs(k // m - i) + abs(k % m - j) for i, j in goals)) if heuristic else (lambda k: 0)
+        entries = {}    # perimeter cell id -> (interior target, cost) edges
+        for t in targets:
+            if self.interior(t):
+                for x, w in self.projections(t):
+                    entries.setdefault(x, []).append((t, w))
+
+        queue = IndexedHeap()
+        queue.push(source, estimate(source), 0)
+        g = {source: 0}
+        parent = {source: source}
+        closed = set()
+        while queue:
+            u, _, cost = queue.pop()
+            if u in targets:
+                result = [u]
+                while result[-1] != source:
+                    result.append(parent[result[-1]])
+                result.reverse()
+                return self.expand(result)
+            closed.add(u)
+            maze.states_explored += 1
+            if self.interior(u):
+                successors = self.projections(u) + [(t, distance(u, t)) for t in targets if self.owner[t] == self.owner[u]]
+            else:
+                successors = self.edges(u) + entries.get(u, [])
+            for v, w in successors:
+                if v not in closed and cost + w < g.get(v, cost + w + 1):
+                    g[v] = cost + w
+                    parent[v] = u
+                    queue.push(v, cost + w + estimate(v), cost + w)
+        return []
+
+def decomposition(maze):
+    """Returns the rectangle decomposition of `maze`, cached on the maze"""
+    return maze.cached('decomposition', lambda: Decomposition(maze))
@@ -0,0 +1,90 @@
+# replan.py
+# ---------------
+# Licensing Information:  You are free to use or extend this projects for
+# educational purposes provided that (1) you do not distribute or publish
+# solutions, (2) you retain this notice, and (3) you provide clear
+# attribution to the University of Illinois at Urbana-Champaign
+
+"""
+This file contains an incremental planner for mazes edited with `Maze.set_cell`. It keeps
+its search state between queries, so after an edit only the cells whose distance from the
+source changed are expanded again, instead of searching the whole maze from scratch.
+"""
+
+from pqueue import IndexedHeap
+
+INF = float('inf')
+
+class Planner:
+    """
+    Lifelong planning A* (LPA*) between two cell ids of `maze`, by default from the start
+    to the first waypoint. Call `path` after any number of `maze.set_cell` edits.
+    """
+    def __init__(self, maze, source = None, target = None):
+        self.maze   = maze
+        self.source = maze.index( * maze.start ) if source is None else source
+        self.target = maze.index( * maze.waypoints[0] ) if target is None else target
+
+        self._free  = maze.free_mask()
+        self._seen  = len(maze.edited)
+        self._g     = {}
+        self._rhs   = {self.source: 0}
+        self._queue = IndexedHeap()
+        self._queue.push(self.source, self._key(self.source))
+
+    def _heuristic(self, k):
+        m = self.maze.size.x
+        return abs(k // m - self.target // m) + abs(k % m - self.target % m)
+
+    def _key(self, k):
+        d = min(self._g.get(k, INF), self._rhs.get(k, INF))
+        return (d + self._heuristic(k), d)
+
+    def _update(self, k):
+        # recomputes the one-step lookahead of k and queues it if it became inconsistent
+        if k != self.source:
+            g = self._g
+            self._rhs[k] = min((g.get(x, INF) + 1 for x in self.maze.adjacent_ids(k)), default = INF) if self._free[k] else INF
+        if k in self._queue:
+            self._queue.remove(k)
+        if self._g.get(k, INF) != self._rhs.get(k, INF):
+            self._queue.push(k, self._key(k))
+
+    def _apply_edits(self):
+        m = self.maze.size.x
+        edits = self.maze.edited[self._seen:]
+        self._seen += len(edits)
+        for k in edits:
+            self._free[k] = self.maze.navigable( * self.maze.cell(k) )
+        for k in edits:
+            for x in (k, k + m, k - m, k + 1, k - 1):
+                self._update(x)
+
+    def _compute(self):
+        g, rhs, queue, target = self._g, self._rhs, self._queue, self.target
+        while queue and (queue.peek()[1] < self._key(target) or rhs.get(target, INF) != g.get(target, INF)):
+            k = queue.pop()[0]
+            if g.get(k, INF) > rhs.get(k, INF):
+                g[k] = rhs[k]
+            else:
+                g[k] = INF
+                self._update(k)
+            for x in self.maze.neighbor_ids(k):
+                self._update(x)
+
+    def path(self):
+        """
+        Repairs the search for the edits made since the last call and returns the shortest path.
+
+        @return path: a list of (row, col) from the source to the target, or [] if it is unreachable
+        """
+        self._apply_edits()
+        self._compute()
+        g = self._g
+        if g.get(self.target, INF) == INF:
+            return []
+        result = [self.target]
+        while result[-1] != self.source:
+            result.append(min(self.maze.adjacent_ids(result[-1]), key = lambda x: g.get(x, INF)))
+        result.reverse()
+        return [self.maze.cell(k) for k in result]
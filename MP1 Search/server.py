@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+# server.py
+# ---------------
+# Licensing Information:  You are free to use or extend this projects for
+# educational purposes provided that (1) you do not distribute or publish
+# solutions, (2) you retain this notice, and (3) you provide clear
+# attribution to the University of Illinois at Urbana-Champaign
+
+"""
+This file contains a local asyncio query server for the searches in `search.py`. Clients
+send one JSON object per line, {"id": ..., "maze": <path>, "method": <search>, "args": {...}},
+and get one JSON object per line back with the same id and either the path, states explored
+and elapsed time, or an error. Responses on one connection may arrive out of order.
+
+Mazes are identified by a hash of their file contents. Queries for the same maze that arrive
+within `window` seconds of each other are sent to a worker process as one batch, and every
+maze always goes to the same worker, which keeps the most recently used `capacity` mazes
+loaded, together with the distance fields and MST weights the searches cache on them.
+"""
+
+import argparse, asyncio, hashlib, json, os, time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import search
+from cache import SolutionCache
+from maze import Maze, MazeError
+
+METHODS = ('bfs', 'bfs_bidirectional', 'astar_single', 'jps_single', 'astar_multiple', 'fast', 'ida_star', 'sma_star',
+    'held_karp', 'tour', 'hpa_single', 'hpa_multiple', 'contracted_single', 'contracted_multiple', 'alt_single',
+    'rsr_bfs', 'rsr_single', 'hda_star', 'bfs_wavefront')
+
+# mazes loaded in this worker process by content hash, least recently used first
+_mazes = OrderedDict()
+
+def run_batch(key, path, queries, capacity, cache = None):
+    """
+    Runs (method, arguments) queries on the maze with content hash `key` inside a worker
+    process, loading it from `path` unless it is cached. Results stored in `cache` (a
+    `cache.SolutionCache`) are reused instead of searching.
+
+    @return responses: one dict per query
+    """
+    maze = _mazes.pop(key, None)
+    cached = maze is not None
+    if maze is None:
+        try:
+            maze = Maze(path)
+        except (OSError, MazeError) as error:
+            return [{'error': str(error)}] * len(queries)
+    _mazes[key] = maze
+    while len(_mazes) > capacity:
+        _mazes.popitem(last = False)
+
+    responses = []
+    for method, arguments in queries:
+        maze.states_explored = 0
+        start = time.perf_counter()
+        try:
+            if cache is not None:
+                path = cache.solve(maze, method, ** arguments )
+            else:
+                path = getattr(search, method)(maze, ** arguments )
+        except Exception as error:
+            # bad arguments raise anything from TypeError to ZeroDivisionError, and one failing
+            # query must not take down the rest of the batch
+            responses.append({'error': '{0}: {1}: {2}'.format(method, type(error).__name__, error)})
+            continue
+        responses.append({
+            'path'              : path,
+            'states_explored'   : maze.states_explored,
+            'elapsed'           : time.perf_counter() - start,
+            'cached'            : cached,
+        })
+        cached = True
+    return responses
+
+class QueryServer:
+    """
+    Batches queries per maze and runs them on `workers` single-process executors, chosen by
+    content hash so that each maze stays cached in one worker.
+    """
+    def __init__(self, workers = None, capacity = 32, window = 0.002, cache = None):
+        self.executors  = [ProcessPoolExecutor(1) for _ in range(workers or os.cpu_count() or 1)]
+        self.capacity   = capacity
+        self.window     = window
+        self.cache      = cache
+        self._pending   = {}    # content hash -> (path, [(method, arguments, future)]) waiting for dispatch
+        self._tasks     = set() # running dispatches, referenced so that they are not garbage collected
+        self._digests   = {}    # path -> (mtime, size, content hash)
+
+    def digest(self, path):
+        """Returns the sha1 hex digest of the contents of `path`, rehashing only when its mtime or size changed"""
+        stat = os.stat(path)
+        entry = self._digests.get(path)
+        if entry is None or entry[:2] != (stat.st_mtime_ns, stat.st_size):
+            with open(path, 'rb') as file:
+                entry = self._digests[path] = (stat.st_mtime_ns, stat.st_size, hashlib.sha1(file.read()).hexdigest())
+        return entry[2]
+
+    async def query(self, path, method, arguments = {}):
+        """Runs one query, batched with the other queries on the same maze"""
+        if method not in METHODS:
+            return {'error': 'unknown search method \'{0}\''.format(method)}
+        try:
+            key = self.digest(path)
+        except OSError as error:
+            return {'error': str(error)}
+        loop = asyncio.get_running_loop()
+        if key not in self._pending:
+            self._pending[key] = (path, [])
+            loop.call_later(self.window, self.start_dispatch, key)
+        future = loop.create_future()
+        self._pending[key][1].append((method, arguments, future))
+        return await future
+
+    def start_dispatch(self, key):
+        """Starts `dispatch(key)` as a task held in self._tasks until it is done"""
+        task = asyncio.get_running_loop().create_task(self.dispatch(key))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def dispatch(self, key):
+        path, queries = self._pending.pop(key)
+        executor = self.executors[int(key[:8], 16) % len(self.executors)]
+        try:
+            responses = await asyncio.get_running_loop().run_in_executor(executor, run_batch,
+                key, path, [(method, arguments) for method, arguments, _ in queries], self.capacity, self.cache)
+        except BrokenProcessPool:
+            # a worker that died (e.g. out of memory) is replaced, its queries fail
+            self.executors[self.executors.index(executor)] = ProcessPoolExecutor(1)
+            responses = [{'error': 'worker process terminated'}] * len(queries)
+        except Exception as error:
+            # e.g. arguments or results that cannot be pickled; every waiting client gets an answer
+            responses = [{'error': 'batch failed: {0}: {1}'.format(type(error).__name__, error)}] * len(queries)
+        for (_, _, future), response in zip(queries, responses):
+            if not future.done():
+                future.set_result(response)
+
+    async def handle(self, reader, writer):
+        tasks = set()
+        async def respond(request):
+            if not isinstance(request, dict) or not isinstance(request.get('args', {}), dict):
+                response = {'error': 'request must be an object with `maze`, `method` and optional `args` object'}
+            else:
+                response = await self.query(str(request.get('maze')), request.get('method'), request.get('args', {}))
+            response = dict(response, id = request.get('id') if isinstance(request, dict) else None)
+            writer.write(json.dumps(response).encode() + b'\n')
+
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            try:
+                request = json.loads(line)
+            except ValueError as error:
+                writer.write(json.dumps({'id': None, 'error': 'invalid JSON: {0}'.format(error)}).encode() + b'\n')
+                continue
+            task = asyncio.get_running_loop().create_task(respond(request))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+        if tasks:
+            await asyncio.wait(tasks)
+        await writer.drain()
+        writer.close()
+
+    async def serve(self, host = '127.0.0.1', port = 8440, unix = None):
+        if unix is not None:
+            server = await asyncio.start_unix_server(self.handle, unix)
+        else:
+            server = await asyncio.start_server(self.handle, host, port)
+        async with server:
+            await server.serve_forever()
+
+    def close(self):
+        for executor in self.executors:
+            executor.shutdown(cancel_futures = True)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description     = 'CS440 MP1 search query server',
+        formatter_class = argparse.ArgumentDefaultsHelpFormatter)
+
+    parser.add_argument('--host', dest = 'host', type = str, default = '127.0.0.1',
+                        help = 'address to listen on')
+    parser.add_argument('--port', dest = 'port', type = int, default = 8440,
+                        help = 'TCP port to listen on')
+    parser.add_argument('--unix', dest = 'unix', type = str, default = None,
+                        help = 'listen on this Unix socket instead of TCP')
+    parser.add_argument('--workers', dest = 'workers', type = int, default = None,
+                        help = 'worker processes (default: CPU count)')
+    parser.add_argument('--capacity', dest = 'capacity', type = int, default = 32,
+                        help = 'mazes kept loaded per worker')
+    parser.add_argument('--window', dest = 'window', type = float, default = 0.002,
+                        help = 'seconds to collect queries on one maze into a batch')
+    parser.add_argument('--cache', dest = 'cache', type = str, default = None,
+                        help = 'store and reuse search results in this directory')
+
+    arguments = parser.parse_args()
+    server = QueryServer(arguments.workers, arguments.capacity, arguments.window,
+        SolutionCache(arguments.cache) if arguments.cache is not None else None)
+    try:
+        asyncio.run(server.serve(arguments.host, arguments.port, arguments.unix))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
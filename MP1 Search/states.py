@@ -0,0 +1,82 @@
+# states.py
+# ---------------
+# Licensing Information:  You are free to use or extend this projects for
+# educational purposes provided that (1) you do not distribute or publish
+# solutions, (2) you retain this notice, and (3) you provide clear
+# attribution to the University of Illinois at Urbana-Champaign
+
+"""
+This file contains a compact store for (cell id, remaining waypoint mask) search states.
+Each state gets a dense integer id, and its g, f, parent and closed flag live in typed
+`array` buffers indexed by that id instead of in dicts keyed by tuples, which brings the
+bookkeeping down from hundreds of bytes per state to a few dozen.
+"""
+
+import sys
+from array import array
+
+BLOCK = 64  # cells per page of the state id lookup table
+
+class StateStore:
+    """
+    Dense ids for (cell, mask) states of a maze with `cells` cell ids and masks of `bits`
+    bits. Ids are looked up in pages of BLOCK int32 slots, one page per (mask, cell // BLOCK)
+    that has been reached, and the per-id buffers double in capacity whenever they fill up.
+    Masks wider than 64 bits do not fit a typed array and are kept in a list instead.
+    """
+    def __init__(self, cells, capacity = 1024, bits = 64):
+        self._blocks    = (cells + BLOCK - 1) // BLOCK
+        self._pages     = {}    # mask * blocks + cell // BLOCK -> array of ids, -1 if unseen
+        self._count     = 0
+        self.cell       = array('i', bytes(4 * capacity))
+        self.mask       = array('Q', bytes(8 * capacity)) if bits <= 64 else [0] * capacity
+        self.g          = array('I', bytes(4 * capacity))
+        self.f          = array('d', bytes(8 * capacity))
+        self.parent     = array('i', bytes(4 * capacity))
+        self.closed     = bytearray(capacity)
+
+    def __len__(self):
+        return self._count
+
+    def find(self, cell, mask):
+        """Returns the id of state (cell, mask), or -1 if it has not been added"""
+        page = self._pages.get(mask * self._blocks + cell // BLOCK)
+        return -1 if page is None else page[cell % BLOCK]
+
+    def add(self, cell, mask, g, f, parent = -1):
+        """Adds the unseen state (cell, mask) and returns its id"""
+        key = mask * self._blocks + cell // BLOCK
+        page = self._pages.get(key)
+        if page is None:
+            page = self._pages[key] = array('i', [-1]) * BLOCK
+        k = self._count
+        if k == len(self.closed):
+            self._grow()
+        page[cell % BLOCK] = k
+        self.cell[k]    = cell
+        self.mask[k]    = mask
+        self.g[k]       = g
+        self.f[k]       = f
+        self.parent[k]  = parent
+        self.closed[k]  = 0
+        self._count += 1
+        return k
+
+    def _grow(self):
+        for buffer in (self.cell, self.mask, self.g, self.f, self.parent, self.closed):
+            buffer.extend(buffer)
+
+    def path(self, maze, k):
+        """Walks the parents back from id `k` to the root, returning the (row, col) path"""
+        result = []
+        while k != -1:
+            result.append(maze.cell(self.cell[k]))
+            k = self.parent[k]
+        result.reverse()
+        return result
+
+    def nbytes(self):
+        """Returns the bytes held by the id buffers and lookup pages, for comparing memory use"""
+        buffers = (self.cell, self.mask, self.g, self.f, self.parent)
+        return (sum(sys.getsizeof(x) if isinstance(x, list) else x.itemsize * len(x) for x in buffers) +
+            len(self.closed) + 4 * BLOCK * len(self._pages))
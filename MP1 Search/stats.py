@@ -0,0 +1,221 @@
+# stats.py
+# ---------------
+# Licensing Information:  You are free to use or extend this projects for
+# educational purposes provided that (1) you do not distribute or publish
+# solutions, (2) you retain this notice, and (3) you provide clear
+# attribution to the University of Illinois at Urbana-Champaign
+
+"""
+This file contains opt-in instrumentation for the searches in `search.py`. `profile` runs
+one search method with counting versions of the open list structures (including the layers
+of the bit-parallel BFS) and timed versions of the heuristic helpers swapped into the search
+modules, and returns the path together with
+a `Stats` object. Nothing is swapped outside of `profile`, so normal calls pay no cost.
+Swapping module attributes is not thread safe; profile one search at a time.
+"""
+
+import heapq
+import time
+from collections import deque
+from types import SimpleNamespace
+
+import contract
+import hpa
+import rectangles
+import search
+import wavefront
+from pqueue import IndexedHeap
+
+class Stats:
+    """
+    Counters for one search run. `closed` is the number of distinct states popped from each
+    open list, summed over the open lists of the run, or for searches on a plain queue the
+    number of distinct cells expanded, or for the bit-parallel BFS the cells of the layers it
+    grew. Its pushes and pops count the cells of each new and of each grown layer. `stale`
+    counts pops of states that had already been popped from the same open list, and `reopened`
+    counts pushes of such states. `expanded` is the increase of `maze.states_explored`.
+
+    The open list counters stay 0 for searches without one: `bfs_bidirectional` grows plain
+    lists of cells, `ida_star` searches depth first and `hda_star` runs in worker processes.
+    Only `expanded` and the times are reported for those.
+    """
+    def __init__(self):
+        self.pushes         = 0
+        self.pops           = 0
+        self.decreases      = 0
+        self.reopened       = 0
+        self.stale          = 0
+        self.max_open       = 0
+        self.closed         = 0
+        self.expanded       = 0
+        self.heuristic_time = 0.0
+        self.preprocess_time = 0.0
+        self.expansion_time = 0.0
+        self.total_time     = 0.0
+        self._popped        = []    # the set of keys popped from each open list
+        self._cells         = set()
+        self._timing        = False
+
+    def as_dict(self):
+        return {key: value for key, value in vars(self).items() if not key.startswith('_')}
+
+    def timed(self, function, field):
+        """Wraps `function` so that its outermost calls add their duration to self.<field>"""
+        def wrapper( * args , ** kwargs ):
+            if self._timing:
+                return function( * args , ** kwargs )
+            self._timing = True
+            start = time.perf_counter()
+            try:
+                return function( * args , ** kwargs )
+            finally:
+                setattr(self, field, getattr(self, field) + time.perf_counter() - start)
+                self._timing = False
+        return wrapper
+
+    def heap(self):
+        """Returns an IndexedHeap subclass that reports to this object"""
+        stats = self
+        class CountingHeap(IndexedHeap):
+            def __init__(self):
+                super().__init__()
+                self.popped = set()
+                stats._popped.append(self.popped)
+
+            def push(self, key, f, g = 0):
+                if key in self:
+                    return self.decrease_key(key, f, g)
+                stats.pushes += 1
+                stats.reopened += key in self.popped
+                result = super().push(key, f, g)
+                stats.max_open = max(stats.max_open, len(self))
+                return result
+
+            def decrease_key(self, key, f, g = 0):
+                result = super().decrease_key(key, f, g)
+                stats.decreases += result
+                return result
+
+            def pop(self):
+                result = super().pop()
+                stats.pops += 1
+                if result[0] in self.popped:
+                    stats.stale += 1
+                self.popped.add(result[0])
+                return result
+        return CountingHeap
+
+    def heapq(self):
+        """
+        Returns a stand-in for the `heapq` module that reports to this object. Entries must
+        end with their key; a key pushed again without being popped counts as a decrease.
+        """
+        stats = self
+        queues = {}     # id of each heap list -> (keys queued, keys popped)
+        def state(queue):
+            if id(queue) not in queues:
+                queues[id(queue)] = (set(), set())
+                stats._popped.append(queues[id(queue)][1])
+            return queues[id(queue)]
+
+        def heappush(queue, entry):
+            queued, popped = state(queue)
+            key = entry[-1]
+            if key in queued:
+                stats.decreases += 1
+            else:
+                stats.pushes += 1
+                stats.reopened += key in popped
+                queued.add(key)
+            heapq.heappush(queue, entry)
+            stats.max_open = max(stats.max_open, len(queued))
+
+        def heappop(queue):
+            queued, popped = state(queue)
+            entry = heapq.heappop(queue)
+            stats.pops += 1
+            key = entry[-1]
+            # entries left behind by a decrease are popped after the key itself and count as stale
+            stats.stale += key in popped
+            queued.discard(key)
+            popped.add(key)
+            return entry
+        return SimpleNamespace(heappush = heappush, heappop = heappop)
+
+    def queue(self):
+        """Returns a deque subclass that reports to this object"""
+        stats = self
+        class CountingDeque(deque):
+            def append(self, x):
+                stats.pushes += 1
+                super().append(x)
+                stats.max_open = max(stats.max_open, len(self))
+
+            def popleft(self):
+                stats.pops += 1
+                return super().popleft()
+        return CountingDeque
+
+    def wavefront(self):
+        """Returns a `wavefront.Wavefront` subclass that reports its layers to this object"""
+        stats = self
+        class CountingWavefront(wavefront.Wavefront):
+            def grow(self, side):
+                layer = self.front[side].bit_count()
+                if not super().grow(side):
+                    return False
+                stats.pops += layer
+                stats.pushes += self.front[side].bit_count()
+                stats.max_open = max(stats.max_open, sum(f.bit_count() for f in self.front))
+                return True
+        return CountingWavefront
+
+def profile(method, maze, * args , ** kwargs ):
+    """
+    Runs `search.<method>(maze, *args, **kwargs)` with instrumentation.
+
+    @return path, stats: the path returned by the search and its Stats
+    """
+    stats = Stats()
+    heap, queue = stats.heap(), stats.queue()
+    swaps = [(module, 'IndexedHeap', heap) for module in (search, hpa, contract, rectangles)] + [
+        (search, 'deque', queue),
+        (search, 'heapq', stats.heapq()),
+        (wavefront, 'Wavefront', stats.wavefront()),
+        (wavefront, 'free_rows', stats.timed(wavefront.free_rows, 'preprocess_time')),
+        (search, 'waypoint_fields', stats.timed(search.waypoint_fields, 'preprocess_time')),
+        (search, 'manhattan', stats.timed(search.manhattan, 'heuristic_time')),
+        (search, 'get_min', stats.timed(search.get_min, 'heuristic_time')),
+        (search, 'mst_dis', stats.timed(search.mst_dis, 'heuristic_time')),
+        (search.MST, 'compute_mst_weight', stats.timed(search.MST.compute_mst_weight, 'heuristic_time')),
+    ]
+    waypoint_heuristic = search.waypoint_heuristic
+    swaps.append((search, 'waypoint_heuristic',
+        lambda * args : stats.timed(waypoint_heuristic( * args ), 'heuristic_time')))
+
+    # records expanded cells on the maze instance without touching the Maze class
+    neighbor_ids, neighbors = maze.neighbor_ids, maze.neighbors
+    def counted_neighbor_ids(index):
+        stats._cells.add(index)
+        return neighbor_ids(index)
+    def counted_neighbors(i, j):
+        stats._cells.add(maze.index(i, j))
+        return neighbors(i, j)
+
+    saved = [(module, name, getattr(module, name)) for module, name, _ in swaps]
+    for module, name, value in swaps:
+        setattr(module, name, value)
+    maze.neighbor_ids, maze.neighbors = counted_neighbor_ids, counted_neighbors
+    explored = maze.states_explored
+    start = time.perf_counter()
+    try:
+        path = getattr(search, method)(maze, * args , ** kwargs )
+    finally:
+        stats.total_time = time.perf_counter() - start
+        for module, name, value in saved:
+            setattr(module, name, value)
+        del maze.neighbor_ids, maze.neighbors
+    stats.expanded = maze.states_explored - explored
+    stats.closed = sum(map(len, stats._popped)) or len(stats._cells) or stats.expanded
+    stats.expansion_time = stats.total_time - stats.heuristic_time - stats.preprocess_time
+    return path, stats
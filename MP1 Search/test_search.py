@@ -0,0 +1,201 @@
+# test_search.py
+# ---------------
+# Licensing Information:  You are free to use or extend this projects for
+# educational purposes provided that (1) you do not distribute or publish
+# solutions, (2) you retain this notice, and (3) you provide clear
+# attribution to the University of Illinois at Urbana-Champaign
+
+"""
+This file contains regression tests for the searches in `search.py` on small generated
+mazes. Run it with `python -m unittest test_search` from this directory.
+"""
+
+import os
+import random
+import tempfile
+import time
+import unittest
+
+import generate
+import landmarks
+import replan
+import search
+from maze import Maze
+
+def room(size, cells):
+    """Returns the lines of an empty `size` x `size` room with the (row, col, character) `cells` placed in it"""
+    lines = ['%' * size] + ['%' + ' ' * (size - 2) + '%' for _ in range(size - 2)] + ['%' * size]
+    for i, j, c in cells:
+        lines[i] = lines[i][:j] + c + lines[i][j + 1:]
+    return lines
+
+def reference_validate_path(maze, path):
+    """The previous `Maze.validate_path`, which checks a whole path list one check at a time"""
+    if len(path) == 0:
+        return 'path must not be empty'
+    if not all(len(vertex) == 2 for vertex in path):
+        return 'each path element must be a two-element sequence'
+    path = tuple(map(tuple, path))
+    for i, (a, b) in enumerate(zip(path, path[1:])):
+        if sum(abs(q - p) for p, q in zip(a, b)) != 1:
+            return 'path vertex {1} ({4}, {5}) must be exactly one move away from path vertex {0} ({2}, {3})'.format(
+                i, i + 1, * a , * b )
+    for i, x in enumerate(path):
+        if not maze.navigable( * x ):
+            return 'path vertex {0} ({1}, {2}) is not a navigable maze cell'.format(i, * x )
+    if path[-1] not in maze.waypoints:
+        return 'last path vertex {0} ({1}, {2}) must be a waypoint'.format(len(path) - 1, * path[-1] )
+    indices = {}
+    for i, x in enumerate(path):
+        if x in indices and all(maze[y] != maze.legend.waypoint for y in path[indices[x] : i]):
+            return 'path segment [{0} : {1}] contains no waypoints'.format(indices[x], i)
+        indices[x] = i
+    for i, x in enumerate(maze.waypoints):
+        if x not in indices:
+            return 'waypoint {0} ({1}, {2}) was never visited'.format(i, * x )
+
+def mutations(path, rng, cells, waypoints):
+    """Yields copies of `path` with random deletions, repeats, detours, swaps, reversals, truncations and foreign cells"""
+    n = len(path)
+    for _ in range(40):
+        x = list(path)
+        i, j = sorted(rng.randrange(n) for _ in range(2))
+        kind = rng.randrange(8)
+        if kind == 0:
+            del x[i]
+        elif kind == 1:
+            x.insert(i, x[i])
+        elif kind == 2 and i > 0:
+            # step back and forth, which revisits a cell with or without a waypoint in between
+            x[i + 1:i + 1] = [x[i - 1], x[i]]
+        elif kind == 3:
+            x[i], x[j] = x[j], x[i]
+        elif kind == 4:
+            x[i:j] = x[i:j][::-1]
+        elif kind == 5:
+            # stop early, at a waypoint when one comes before vertex j
+            stops = [k for k in range(j + 1) if x[k] in waypoints] or [j]
+            x = x[:stops[-1] + 1]
+        elif kind == 6:
+            x[i] = rng.choice(cells)
+        else:
+            x[i] = x[i] + (0, )
+        yield x
+
+class SearchTest(unittest.TestCase):
+    def load(self, lines):
+        with tempfile.NamedTemporaryFile('w', suffix = '.txt', delete = False) as file:
+            file.write('\n'.join(lines) + '\n')
+        self.addCleanup(os.remove, file.name)
+        return Maze(file.name)
+
+    def test_validate_path_matches_reference(self):
+        # the single pass validator must give the message of the previous one, also for generators
+        rng = random.Random(0)
+        for seed in range(12):
+            lines = generate.generate(15, 20, 0.2, 'maze' if seed % 2 else 'open', 1 + seed % 4, seed)
+            maze = self.load(lines)
+            path = search.astar_multiple(maze)
+            cells = list(maze.indices())
+            for x in [path, path[:1], [], [(1, 1)]] + list(mutations(path, rng, cells, maze.waypoints)):
+                expected = reference_validate_path(maze, x)
+                self.assertEqual(maze.validate_path(x), expected)
+                self.assertEqual(maze.validate_path(iter(x)), expected)
+                self.assertEqual(maze.validate_path(list(map(list, x))), expected)
+
+    def test_sma_star_budget_too_small(self):
+        # the optimal path has 44 cells, more than fit in the memory of any of these budgets
+        lines = room(14, [(1, 1, 'P'), (1, 12, '.'), (12, 1, '.'), (12, 12, '.'), (6, 6, '.')])
+        optimal = len(search.astar_multiple(self.load(lines)))
+        for budget in (8, 16, optimal - 1):
+            maze = self.load(lines)
+            start = time.perf_counter()
+            self.assertEqual(search.sma_star(maze, budget), [])
+            self.assertLess(time.perf_counter() - start, 5)
+
+    def test_sma_star_budget_fits(self):
+        lines = room(14, [(1, 1, 'P'), (1, 12, '.'), (12, 1, '.'), (12, 12, '.'), (6, 6, '.')])
+        optimal = len(search.astar_multiple(self.load(lines)))
+        for budget in (optimal, optimal + 4):
+            maze = self.load(lines)
+            path = search.sma_star(maze, budget)
+            self.assertEqual(len(path), optimal)
+            self.assertIsNone(maze.validate_path(path))
+
+    def test_many_waypoints(self):
+        # masks of more than 64 waypoints do not fit 64-bit typed arrays
+        lines = ['%' * 77, '%P' + '.' * 74 + '%', '%' * 77]
+        for method in (search.astar_multiple, search.ida_star):
+            maze = self.load(lines)
+            path = method(maze)
+            self.assertEqual(len(path), 75)
+            self.assertIsNone(maze.validate_path(path))
+
+    def test_unreachable_waypoint(self):
+        # walling in a waypoint after loading leaves no path that visits every waypoint
+        lines = room(8, [(1, 1, 'P'), (3, 3, '.'), (6, 6, '.')])
+        for method in (search.astar_multiple, search.fast, search.held_karp, search.ida_star):
+            maze = self.load(lines)
+            for i, j in ((5, 6), (6, 5)):
+                maze.set_cell(i, j, True)
+            self.assertEqual(method(maze), [])
+
+    def test_held_karp_many_waypoints(self):
+        # above the limit held_karp only runs the tour heuristic when asked to
+        lines = room(12, [(1, 1, 'P')] + [(i, j, '.') for i in (3, 5, 7, 9) for j in (2, 4, 6, 8, 10)] + [(10, 10, '.')])
+        self.assertGreater(len(self.load(lines).waypoints), search.HELD_KARP_LIMIT)
+        with self.assertRaises(ValueError):
+            search.held_karp(self.load(lines))
+        for method in (lambda maze: search.held_karp(maze, fallback = True), search.hpa_multiple):
+            maze = self.load(lines)
+            start = time.perf_counter()
+            path = method(maze)
+            self.assertLess(time.perf_counter() - start, 5)
+            self.assertIsNone(maze.validate_path(path))
+
+    def test_wavefront_matches_bfs(self):
+        # path recovery walks back from checkpoints every square number of layers
+        for seed in range(20):
+            lines = generate.generate(90, 130, 0.3 if seed % 2 else 0.0, 'open', 1, seed)
+            expected = search.bfs(self.load(lines))
+            maze = self.load(lines)
+            path = search.bfs_wavefront(maze)
+            self.assertEqual(len(path), len(expected))
+            self.assertIsNone(maze.validate_path(path))
+
+    def test_planner_matches_bfs(self):
+        # the repaired search must stay as short as a fresh bfs while walls come and go
+        rng = random.Random(0)
+        for seed in range(6):
+            maze = self.load(generate.generate(25, 35, 0.3, 'maze' if seed % 2 else 'open', 1, seed))
+            planner = replan.Planner(maze)
+            fixed = {maze.start} | set(maze.waypoints)
+            cells = [(i, j) for i in range(1, maze.size.y - 1) for j in range(1, maze.size.x - 1) if (i, j) not in fixed]
+            for _ in range(30):
+                for i, j in rng.sample(cells, rng.randint(1, 8)):
+                    maze.set_cell(i, j, rng.random() < 0.6)
+                path = planner.path()
+                expected = search.bfs(maze)
+                self.assertEqual(len(path), len(expected))
+                if path:
+                    self.assertIsNone(maze.validate_path(path))
+
+    def test_landmark_sidecar_count(self):
+        # a sidecar saved for another number of landmarks is rebuilt instead of reused
+        lines = room(20, [(1, 1, 'P'), (18, 18, '.')])
+        path = tempfile.mktemp(suffix = '.alt')
+        self.addCleanup(lambda: os.path.exists(path) and os.remove(path))
+        self.assertEqual(len(landmarks.index(self.load(lines), 2, path).landmarks), 2)
+        self.assertEqual(len(landmarks.index(self.load(lines), 6, path).landmarks), 6)
+        self.assertEqual(len(landmarks.LandmarkIndex.load(self.load(lines), path, 6).landmarks), 6)
+        self.assertIsNone(landmarks.LandmarkIndex.load(self.load(lines), path, 2))
+
+    def test_hpa_neighboring_clusters(self):
+        # the start and the waypoint are on either side of a cluster border, far from its entrances
+        maze = self.load(room(24, [(10, 14, 'P'), (10, 17, '.')]))
+        path = search.hpa_single(maze)
+        self.assertEqual(len(path), 4)
+        self.assertIsNone(maze.validate_path(path))
+
+if __name__ == '__main__':
+    unittest.main()
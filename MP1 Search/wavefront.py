@@ -0,0 +1,237 @@
+# wavefront.py
+# ---------------
+# Licensing Information:  You are free to use or extend this projects for
+# educational purposes provided that (1) you do not distribute or publish
+# solutions, (2) you retain this notice, and (3) you provide clear
+# attribution to the University of Illinois at Urbana-Champaign
+
+"""
+This file contains a bit-parallel BFS. Sets of cells are Python ints with one bit per cell
+of a window of rows and whole words of columns that grows as the search spreads, so one BFS
+layer is a few shifts, ORs and ANDs over the window instead of a Python loop over the
+frontier. The search grows layers from the source and from the targets in turn until they
+meet. Every layer costs time proportional to the window rather than to the layer, so this
+only pays off while the windows stay small, when the targets are near the source; across a
+large open grid it is slower than a per-cell BFS.
+
+The path is recovered by walking back from the meeting cell through the layers. Only the
+reached cells at depths 0, 1, 4, 9, ... are kept; the layers between two of them are grown
+again inside a small box around the walk, which holds every shortest path back to the
+earlier one.
+"""
+
+from math import isqrt
+
+WORD = 64   # the column window grows by this many columns at a time
+
+def free_rows(maze):
+    """Returns `maze.free_rows()`, cached on the maze"""
+    return maze.cached('free_rows', maze.free_rows)
+
+def pack(values, width):
+    """Returns the int with `values[r]` in bits r * width up to (r + 1) * width"""
+    return int.from_bytes(b''.join(x.to_bytes(width // 8, 'little') for x in values), 'little')
+
+def relayout(x, count, width, shift, new_width):
+    """Moves `count` rows of `width` bits in `x` to rows of `new_width` bits, `shift` columns to the right"""
+    data = x.to_bytes(count * width // 8, 'little')
+    before, after = bytes(shift // 8), bytes((new_width - width - shift) // 8)
+    return int.from_bytes(b''.join(before + data[r * width // 8 : (r + 1) * width // 8] + after
+        for r in range(count)), 'little')
+
+def edges(width, count):
+    """Returns masks of the first and of the last column of `count` rows of `width` bits"""
+    pattern = bytearray(width // 8)
+    pattern[0] = 0x01
+    first = int.from_bytes(bytes(pattern) * count, 'little')
+    pattern[0], pattern[-1] = 0, 0x80
+    return first, int.from_bytes(bytes(pattern) * count, 'little')
+
+class Wavefront:
+    """
+    A BFS growing from cell id `source` (side 0) and from all of `targets` (side 1). Each side
+    keeps the cells it has reached, `seen`, and its newest layer, `front`, `depth` steps from
+    where it started, as bitsets over its own window of rows lo..hi and columns left..left +
+    width. The column windows are merged once the two windows overlap. At depths that are
+    perfect squares `checkpoints` records (depth, seen, lo, hi, left, width) for `walk`.
+    """
+    def __init__(self, maze, source, targets):
+        m               = maze.size.x
+        cells           = ((source, ), tuple(targets))
+        self.maze       = maze
+        self.rows       = free_rows(maze)
+        self.lo         = [min(k // m for k in side) for side in cells]
+        self.hi         = [max(k // m for k in side) for side in cells]
+        self.left       = [min(k % m for k in side) // WORD * WORD for side in cells]
+        self.width      = [(max(k % m for k in side) // WORD + 1) * WORD - self.left[x] for x, side in enumerate(cells)]
+        self.free       = [self.band(x) for x in (0, 1)]
+        self.front      = [0, 0]
+        for x, side in enumerate(cells):
+            for k in side:
+                i, j = divmod(k, m)
+                self.front[x] |= 1 << ((i - self.lo[x]) * self.width[x] + j - self.left[x])
+        self.seen       = list(self.front)
+        self.depth      = [0, 0]
+        self.edges      = [(0, 0, 0), (0, 0, 0)]    # rows, first and last column masks
+        self.explored   = 0     # cells of the layers grown so far
+        self.checkpoints = [[self.checkpoint(x)] for x in (0, 1)]
+
+    def checkpoint(self, side):
+        return (self.depth[side], self.seen[side], self.lo[side], self.hi[side], self.left[side], self.width[side])
+
+    def window(self, side, i):
+        """Returns the free cells of row `i` in the column window of `side`"""
+        return (self.rows[i] >> self.left[side]) & ((1 << self.width[side]) - 1)
+
+    def band(self, side):
+        """Returns the free cells of the window of `side`"""
+        return pack((self.window(side, i) for i in range(self.lo[side], self.hi[side] + 1)), self.width[side])
+
+    def widen(self, side, left, width):
+        """Changes the column window of `side` to left..left + width, which must contain the current one"""
+        count = self.hi[side] - self.lo[side] + 1
+        shift = self.left[side] - left
+        self.front[side] = relayout(self.front[side], count, self.width[side], shift, width)
+        self.seen[side] = relayout(self.seen[side], count, self.width[side], shift, width)
+        self.left[side], self.width[side] = left, width
+        self.free[side] = self.band(side)
+        self.edges[side] = (0, 0, 0)
+
+    def grow(self, side):
+        """Adds the next layer of `side`, counting the cells of the current one as explored, returns False if there is none"""
+        f = self.front[side]
+        if not f:
+            return False
+        # the maze border is all walls, so the window can always grow by a row or a word of
+        # columns past the frontier, and the frontier never wraps around from one row to the next
+        left, right = self.left[side], self.left[side] + self.width[side]
+        count = self.hi[side] - self.lo[side] + 1
+        if self.edges[side][0] < count:
+            # masks with spare rows are kept until the window outgrows them
+            self.edges[side] = (2 * count, * edges(self.width[side], 2 * count))
+        _, first, last = self.edges[side]
+        if f & first and left > 0:
+            left -= WORD
+        if f & last and right < self.maze.size.x:
+            right += WORD
+        if (left, right) != (self.left[side], self.left[side] + self.width[side]):
+            self.widen(side, left, right - left)
+            f = self.front[side]
+        w = self.width[side]
+        if f & ((1 << w) - 1):
+            self.lo[side] -= 1
+            self.free[side] = (self.free[side] << w) | self.window(side, self.lo[side])
+            self.seen[side] <<= w
+            f = self.front[side] = f << w
+        if f >> ((self.hi[side] - self.lo[side]) * w):
+            self.hi[side] += 1
+            self.free[side] |= self.window(side, self.hi[side]) << ((self.hi[side] - self.lo[side]) * w)
+
+        self.explored += f.bit_count()
+        f = ((f << 1) | (f >> 1) | (f << w) | (f >> w)) & self.free[side] & ~self.seen[side]
+        self.front[side] = f
+        self.seen[side] |= f
+        self.depth[side] += 1
+        if isqrt(self.depth[side]) ** 2 == self.depth[side]:
+            self.checkpoints[side].append(self.checkpoint(side))
+        return True
+
+    def overlap(self):
+        """Returns whether the windows of the two sides share a cell"""
+        return (self.lo[0] <= self.hi[1] and self.lo[1] <= self.hi[0] and
+            self.left[0] < self.left[1] + self.width[1] and self.left[1] < self.left[0] + self.width[0])
+
+    def meets(self, side):
+        """Returns a cell id of the newest layer of `side` that the other side has reached, or None"""
+        other = 1 - side
+        if not self.overlap():
+            return None
+        # both sides use the same columns from here on, so their layers only differ by rows
+        if self.left[0] != self.left[1] or self.width[0] != self.width[1]:
+            left = min(self.left)
+            width = max(x + w for x, w in zip(self.left, self.width)) - left
+            for x in (0, 1):
+                if (self.left[x], self.width[x]) != (left, width):
+                    self.widen(x, left, width)
+        w = self.width[side]
+        shift = (self.lo[side] - self.lo[other]) * w
+        f = self.front[side]
+        common = (f << shift if shift >= 0 else f >> -shift) & self.seen[other]
+        if not common:
+            return None
+        r, c = divmod((common & -common).bit_length() - 1, w)
+        return (self.lo[other] + r) * self.maze.size.x + self.left[other] + c
+
+    def walk(self, side, k, depth):
+        """
+        Returns the cell ids of a shortest path from cell id `k`, reached by `side` at `depth`,
+        back to a cell `side` started from.
+        """
+        m = self.maze.size.x
+        result = [k]
+        while depth > 0:
+            s, seen, lo, hi, left, width = next(x for x in reversed(self.checkpoints[side]) if x[0] < depth)
+            # a shortest path back to depth s stays within depth - s cells of k, so the layers
+            # after s are grown again inside a box of that radius plus a border of walls
+            r = depth - s + 1
+            i0, c0 = k // m - r, k % m - r
+            w = (2 * r + 8) // 8 * 8
+            inner = ((1 << (2 * r - 1)) - 1) << 1
+            data = seen.to_bytes((hi - lo + 1) * width // 8, 'little')
+            box = lambda x: (x >> c0 if c0 >= 0 else x << -c0) & ((1 << w) - 1)
+            free, reached = [], []
+            for i in range(i0, i0 + 2 * r + 1):
+                inside = 0 < i - i0 < 2 * r and 0 <= i < self.maze.size.y
+                free.append(box(self.rows[i]) & inner if inside else 0)
+                row = int.from_bytes(data[(i - lo) * width // 8 : (i - lo + 1) * width // 8], 'little') << left if lo <= i <= hi else 0
+                reached.append(box(row))
+            free, f = pack(free, w), pack(reached, w)
+            layers = [f]
+            for _ in range(s + 1, depth):
+                f = ((f << 1) | (f >> 1) | (f << w) | (f >> w)) & free & ~layers[-1]
+                layers.append(layers[-1] | f)
+
+            x = r * w + r
+            for layer in reversed(layers):
+                x = next(y for y in (x + w, x - w, x + 1, x - 1) if y >= 0 and layer >> y & 1)
+                result.append((i0 + x // w) * m + c0 + x % w)
+            k, depth = result[-1], s
+        return result
+
+    def meet(self):
+        """
+        Grows layers from the source and from the targets in turn until a new layer of one side
+        reaches a cell the other side has seen.
+
+        @return meeting: the cell id where the sides met, or None if no target is reachable
+        """
+        side = 0
+        while self.grow(side):
+            k = self.meets(side)
+            if k is not None:
+                return k
+            side = 1 - side
+        return None
+
+def path(maze, source, targets):
+    """
+    Runs the bit-parallel BFS from cell id `source` to the nearest of the cell ids `targets`.
+    The cells of the grown layers are added to `maze.states_explored`; recovering the path
+    goes over cells that were already explored.
+
+    @return path: a list of cell ids from `source` to the reached target, or [] if none is reachable
+    """
+    targets = set(targets)
+    if source in targets:
+        return [source]
+    if not targets:
+        return []
+    search = Wavefront(maze, source, targets)
+    k = search.meet()
+    maze.states_explored += search.explored
+    if k is None:
+        return []
+    # the first cell seen by both sides is at the current depth of each, see `meets`
+    head = search.walk(0, k, search.depth[0])
+    tail = search.walk(1, k, search.depth[1])
+    return head[::-1] + tail[1:]